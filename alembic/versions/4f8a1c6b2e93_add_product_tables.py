@@ -0,0 +1,59 @@
+"""add product tables
+
+Revision ID: 4f8a1c6b2e93
+Revises: 9b7e2a4c1d05
+Create Date: 2026-10-19 12:40:12.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f8a1c6b2e93'
+down_revision: Union[str, None] = '9b7e2a4c1d05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 'produtos' e 'historico_preco_produto' foram criadas via Base.metadata.create_all
+    # e nunca passaram por uma migração: cria as tabelas se ainda não existirem.
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('produtos'):
+        op.create_table('produtos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('nome', sa.String(length=255), nullable=False),
+        sa.Column('descricao', sa.Text(), nullable=True),
+        sa.Column('unidade_medida', sa.String(length=50), nullable=True),
+        sa.Column('categoria_produto', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['usuario_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_produtos_id'), 'produtos', ['id'], unique=False)
+    if not inspector.has_table('historico_preco_produto'):
+        op.create_table('historico_preco_produto',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('produto_id', sa.Integer(), nullable=False),
+        sa.Column('data_registro', sa.Date(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('preco', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('local_compra', sa.String(length=100), nullable=True),
+        sa.ForeignKeyConstraint(['produto_id'], ['produtos.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_historico_preco_produto_id'), 'historico_preco_produto', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # A partir desta revisão as tabelas pertencem às migrações, mesmo as criadas antes pelo create_all
+    op.drop_index(op.f('ix_historico_preco_produto_id'), table_name='historico_preco_produto')
+    op.drop_table('historico_preco_produto')
+    op.drop_index(op.f('ix_produtos_id'), table_name='produtos')
+    op.drop_table('produtos')
@@ -0,0 +1,34 @@
+"""add agenda due date indexes
+
+Revision ID: 5d1f0c8e7b42
+Revises: a66b435406a1
+Create Date: 2026-10-19 10:04:17.229514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d1f0c8e7b42'
+down_revision: Union[str, None] = 'a66b435406a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_transacoes_user_id_data_vencimento', 'transacoes', ['user_id', 'data_vencimento'], unique=False)
+    op.create_index(
+        'ix_transacoes_pendentes_user_id_data_vencimento', 'transacoes', ['user_id', 'data_vencimento'],
+        unique=False,
+        postgresql_where=sa.text("status = 'PENDENTE'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transacoes_pendentes_user_id_data_vencimento', table_name='transacoes')
+    op.drop_index('ix_transacoes_user_id_data_vencimento', table_name='transacoes')
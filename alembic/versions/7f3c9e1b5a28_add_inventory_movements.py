@@ -0,0 +1,46 @@
+"""add inventory movements
+
+Revision ID: 7f3c9e1b5a28
+Revises: e4b7d2a90c13
+Create Date: 2026-10-19 18:30:12.448207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3c9e1b5a28'
+down_revision: Union[str, None] = 'e4b7d2a90c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('movimentos_estoque',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('estoque_id', sa.Integer(), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('quantidade', sa.Integer(), nullable=False),
+    sa.Column('variacao', sa.Integer(), nullable=False),
+    sa.Column('registrado_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['estoque_id'], ['estoque_pessoal.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['usuario_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_movimentos_estoque_usuario_id_estoque_id', 'movimentos_estoque', ['usuario_id', 'estoque_id'], unique=False)
+    # Ponto de partida para os itens já existentes: a quantidade atual na data em que foram adicionados
+    op.execute(
+        "INSERT INTO movimentos_estoque (estoque_id, usuario_id, quantidade, variacao, registrado_em) "
+        "SELECT id, usuario_id, quantidade, quantidade, COALESCE(data_adicionado, now()) "
+        "FROM estoque_pessoal WHERE quantidade IS NOT NULL AND usuario_id IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_movimentos_estoque_usuario_id_estoque_id', table_name='movimentos_estoque')
+    op.drop_table('movimentos_estoque')
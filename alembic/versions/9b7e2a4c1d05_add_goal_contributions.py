@@ -0,0 +1,55 @@
+"""add goal contributions
+
+Revision ID: 9b7e2a4c1d05
+Revises: 5d1f0c8e7b42
+Create Date: 2026-10-19 11:21:53.870342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b7e2a4c1d05'
+down_revision: Union[str, None] = '5d1f0c8e7b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('metas_financeiras', sa.Column('conta_destino_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'metas_financeiras_conta_destino_id_fkey', 'metas_financeiras', 'contas', ['conta_destino_id'], ['id']
+    )
+    op.create_table('contribuicoes_meta',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('meta_id', sa.Integer(), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('valor', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('data', sa.Date(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('conta_id', sa.Integer(), nullable=True),
+    sa.Column('transacao_id', sa.Integer(), nullable=True),
+    sa.Column('observacoes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['meta_id'], ['metas_financeiras.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['usuario_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['conta_id'], ['contas.id'], ),
+    sa.ForeignKeyConstraint(['transacao_id'], ['transacoes.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_contribuicoes_meta_id'), 'contribuicoes_meta', ['id'], unique=False)
+    op.create_index(op.f('ix_contribuicoes_meta_usuario_id'), 'contribuicoes_meta', ['usuario_id'], unique=False)
+    op.create_index('ix_contribuicoes_meta_meta_id_data', 'contribuicoes_meta', ['meta_id', 'data'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contribuicoes_meta_meta_id_data', table_name='contribuicoes_meta')
+    op.drop_index(op.f('ix_contribuicoes_meta_usuario_id'), table_name='contribuicoes_meta')
+    op.drop_index(op.f('ix_contribuicoes_meta_id'), table_name='contribuicoes_meta')
+    op.drop_table('contribuicoes_meta')
+    op.drop_constraint('metas_financeiras_conta_destino_id_fkey', 'metas_financeiras', type_='foreignkey')
+    op.drop_column('metas_financeiras', 'conta_destino_id')
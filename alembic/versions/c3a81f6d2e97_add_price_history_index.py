@@ -0,0 +1,31 @@
+"""add price history index
+
+Revision ID: c3a81f6d2e97
+Revises: 4f8a1c6b2e93
+Create Date: 2026-10-19 12:47:05.611870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a81f6d2e97'
+down_revision: Union[str, None] = '4f8a1c6b2e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_historico_preco_produto_produto_id_data_registro', 'historico_preco_produto',
+        ['produto_id', 'data_registro'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_historico_preco_produto_produto_id_data_registro', table_name='historico_preco_produto')
@@ -0,0 +1,38 @@
+"""add inventory replenishment indexes
+
+Revision ID: e4b7d2a90c13
+Revises: c3a81f6d2e97
+Create Date: 2026-10-19 17:42:51.603118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7d2a90c13'
+down_revision: Union[str, None] = 'c3a81f6d2e97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_estoque_pessoal_pendentes_usuario_id_quantidade', 'estoque_pessoal', ['usuario_id', 'quantidade'],
+        unique=False,
+        postgresql_where=sa.text("comprado IS NOT TRUE")
+    )
+    op.create_index(
+        'ix_estoque_pessoal_pendentes_usuario_id_data_necessaria', 'estoque_pessoal', ['usuario_id', 'data_necessaria'],
+        unique=False,
+        postgresql_where=sa.text("comprado IS NOT TRUE")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_estoque_pessoal_pendentes_usuario_id_data_necessaria', table_name='estoque_pessoal')
+    op.drop_index('ix_estoque_pessoal_pendentes_usuario_id_quantidade', table_name='estoque_pessoal')
@@ -0,0 +1,86 @@
+# personal_finance_api/benchmarks/bench_import_time.py
+#
+# Mede o custo de importar a aplicação (o que cada worker paga ao iniciar) com `python -X importtime`,
+# em processos novos, e confere que as dependências pesadas continuam fora da inicialização.
+#
+#   python benchmarks/bench_import_time.py
+#   python benchmarks/bench_import_time.py --runs 10 --max-ms 600 --top 15
+#
+# Sai com código 1 se algum módulo proibido for importado ou se a mediana passar de --max-ms,
+# para poder rodar no CI.
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Só devem ser carregados sob demanda (importação/exportação, análises, migrações)
+DEFAULT_FORBIDDEN = ('pandas', 'numpy', 'alembic')
+
+_PROBE = (
+    "import sys, main; "
+    "print('\\n'.join(sorted({name.split('.')[0] for name in sys.modules})))"
+)
+
+
+def run_once(module_env):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE],
+        cwd=PROJECT_ROOT, env=module_env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao importar a aplicação:\n{result.stderr}")
+
+    # Linhas "import time: self [us] | cumulative | nome", com indentação indicando o nível
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        timings[name] = (int(self_us), int(cumulative_us))
+    loaded = set(result.stdout.split())
+    return timings, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de importação da aplicação (inicialização de um worker).")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help="Módulos de maior custo cumulativo a listar.")
+    parser.add_argument('--max-ms', type=float, default=None, help="Falha se a mediana passar deste valor.")
+    parser.add_argument('--forbid', default=','.join(DEFAULT_FORBIDDEN),
+                        help="Pacotes que não podem ser importados na inicialização (separados por vírgula).")
+    args = parser.parse_args()
+
+    module_env = dict(os.environ)
+    module_env.setdefault('DATABASE_URL', 'sqlite://')
+    # Mede só a importação, sem abrir conexões com o banco
+    module_env['DB_POOL_WARMUP'] = '0'
+
+    totals = []
+    for _ in range(args.runs):
+        timings, loaded = run_once(module_env)
+        totals.append(timings['main'][1] / 1000)
+
+    median = statistics.median(totals)
+    print(f"import main: mediana {median:.1f} ms, mín {min(totals):.1f} ms, máx {max(totals):.1f} ms ({args.runs} execuções)")
+
+    print("\nMaiores custos cumulativos (última execução):")
+    for name, (_, cumulative) in sorted(timings.items(), key=lambda item: -item[1][1])[1:args.top + 1]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    forbidden = [name.strip() for name in args.forbid.split(',') if name.strip()]
+    imported = sorted(name for name in forbidden if name in loaded)
+    if imported:
+        print(f"\nFALHA: importados na inicialização: {', '.join(imported)}")
+        failed = True
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"\nFALHA: mediana de {median:.1f} ms acima do limite de {args.max_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
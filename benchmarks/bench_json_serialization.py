@@ -0,0 +1,78 @@
+# personal_finance_api/benchmarks/bench_json_serialization.py
+#
+# Vazão de serialização da listagem de /transactions (to_dict + corpo JSON da resposta),
+# comparando o provedor orjson com o json da biblioteca padrão, sem banco nem HTTP.
+#
+#   python benchmarks/bench_json_serialization.py
+#   python benchmarks/bench_json_serialization.py --rows 20000 --repeat 10
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from flask import Flask  # noqa: E402
+
+from database.models import Transacao, TipoTransacaoEnum, StatusTransacaoEnum  # noqa: E402
+from services.json_provider import OrjsonProvider, StdlibJSONProvider, orjson  # noqa: E402
+
+
+def make_transactions(n):
+    now = datetime(2025, 1, 1, 12, 30, tzinfo=timezone.utc)
+    return [
+        Transacao(
+            id=i + 1,
+            descricao=f"Lançamento {i}",
+            valor=Decimal(i % 5000) / 100 + Decimal('10.00'),
+            tipo=TipoTransacaoEnum.DESPESA if i % 3 else TipoTransacaoEnum.RECEITA,
+            status=StatusTransacaoEnum.PAGO,
+            data=now - timedelta(days=i % 365),
+            data_vencimento=date(2025, 1, 1) + timedelta(days=i % 90),
+            conta_id=1,
+            categoria_id=(i % 12) + 1,
+            user_id=1,
+            created_at=now,
+            updated_at=now,
+            parcelado=False,
+        )
+        for i in range(n)
+    ]
+
+
+def bench(provider, transactions, repeat):
+    # Melhor de N: mede o que a rota faz (to_dict de cada linha + response do jsonify)
+    with provider._app.app_context():
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = provider.response([t.to_dict() for t in transactions])
+            best = min(best, time.perf_counter() - started)
+    return best, len(response.get_data())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialização JSON da listagem de transações.")
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    providers = [('stdlib', StdlibJSONProvider(app))]
+    if orjson is not None:
+        providers.append(('orjson', OrjsonProvider(app)))
+    else:
+        print("orjson não instalado: medindo apenas o json da biblioteca padrão.")
+
+    transactions = make_transactions(args.rows)
+    for name, provider in providers:
+        elapsed, size = bench(provider, transactions, args.repeat)
+        print(f"{name:7s} {args.rows} linhas em {elapsed * 1000:8.1f} ms -> "
+              f"{args.rows / elapsed:10.0f} linhas/s, {size / 1024:.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# personal_finance_api/benchmarks/bench_login.py
+#
+# Mede logins/segundo de um worker: N threads (como um worker gthread) verificando senhas
+# pelo services.password_hashing durante alguns segundos.
+#
+#   PASSWORD_HASH_METHOD=scrypt PASSWORD_HASH_WORKERS=2 python benchmarks/bench_login.py --threads 8
+#   PASSWORD_HASH_WORKERS=0 python benchmarks/bench_login.py   # hash no próprio worker, para comparação
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import password_hashing  # noqa: E402
+
+
+def run(threads, seconds):
+    hashed = password_hashing.hash_password('senha-de-teste')
+    deadline = time.perf_counter() + seconds
+    counts = [0] * threads
+    busy = [0] * threads
+
+    def worker(index):
+        while time.perf_counter() < deadline:
+            try:
+                password_hashing.verify_password(hashed, 'senha-de-teste')
+                counts[index] += 1
+            except password_hashing.HashingBusyError:
+                busy[index] += 1
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return sum(counts), sum(busy), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de verificação de senha (logins/segundo por worker).")
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"método={password_hashing.PASSWORD_HASH_METHOD} "
+          f"processos={password_hashing.PASSWORD_HASH_WORKERS} "
+          f"fila_max={password_hashing.PASSWORD_HASH_MAX_PENDING} threads={args.threads}")
+    logins, busy, elapsed = run(args.threads, args.seconds)
+    print(f"{logins} logins em {elapsed:.2f}s -> {logins / elapsed:.1f} logins/s ({busy} recusados com 503)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,12 @@
 import os
+import threading
+import time
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker, declarative_base, scoped_session
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import QueuePool
 
 load_dotenv()
 
@@ -11,7 +15,72 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("A variável de ambiente DATABASE_URL não está definida.")
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# Pool por processo: com N workers gunicorn o total é N * (DB_POOL_SIZE + DB_MAX_OVERFLOW),
+# que deve caber no limite de conexões do Postgres.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+# Reciclar conexões antes do timeout de ociosidade do servidor/proxy permite desligar o pre-ping
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("true", "1", "yes")
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", 1))
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool que mede o tempo de espera por uma conexão em cada checkout."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def stats(self):
+        # Após engine.dispose() o pool é recriado e as métricas recomeçam do zero
+        with self._stats_lock:
+            checkouts, timeouts = self.checkouts, self.timeouts
+            wait_total, wait_max = self.wait_total, self.wait_max
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "open": self.checkedin() + self.checkedout(),
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_total_ms": round(wait_total * 1000, 2),
+            "wait_avg_ms": round(wait_total * 1000 / checkouts, 3) if checkouts else 0.0,
+            "wait_max_ms": round(wait_max * 1000, 2),
+        }
+
+
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=TimedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
 
 Base = declarative_base()
 
@@ -25,3 +94,23 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def warmup_pool(connections=None):
+    # Abre (e devolve ao pool) as primeiras conexões antes das primeiras requisições
+    connections = min(DB_POOL_WARMUP if connections is None else connections, DB_POOL_SIZE)
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(engine.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+def pool_stats():
+    pool = engine.pool
+    stats = pool.stats() if isinstance(pool, TimedQueuePool) else {"status": pool.status()}
+    stats["pre_ping"] = DB_POOL_PRE_PING
+    stats["recycle"] = DB_POOL_RECYCLE
+    stats["timeout"] = DB_POOL_TIMEOUT
+    return stats
@@ -0,0 +1,107 @@
+# personal_finance_api/database/migrations.py
+#
+# O schema é gerenciado só pelo Alembic: a aplicação não executa DDL ao iniciar.
+# Rodar antes de cada deploy (fase "release" do Procfile):
+#     python -m database.migrations
+import os
+import threading
+import time
+from functools import lru_cache
+
+from sqlalchemy import inspect
+
+from database.db import engine, Base
+from database import models  # registra as tabelas em Base.metadata
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ALEMBIC_INI = os.path.join(PROJECT_ROOT, 'alembic.ini')
+
+# Enquanto o banco estiver atrás do head, a verificação é refeita no máximo a cada N segundos
+SCHEMA_CHECK_INTERVAL = float(os.getenv('SCHEMA_CHECK_INTERVAL', 5))
+
+
+# O Alembic é importado dentro das funções: a aplicação só precisa dele na primeira sondagem
+def alembic_config():
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.set_main_option('script_location', os.path.join(PROJECT_ROOT, 'alembic'))
+    return config
+
+
+@lru_cache(maxsize=1)
+def head_revisions():
+    from alembic.script import ScriptDirectory
+
+    # Os scripts de migração não mudam com o processo rodando: lidos uma única vez
+    return frozenset(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+def current_revisions(connection):
+    from alembic.runtime.migration import MigrationContext
+
+    return frozenset(MigrationContext.configure(connection).get_current_heads())
+
+
+class SchemaCheck:
+    """Compara a revisão do banco com o head dos scripts (uma consulta a alembic_version).
+
+    Depois que o banco alcança o head o resultado fica em cache: o schema só muda
+    com um novo deploy, que sobe processos novos.
+    """
+
+    def __init__(self, interval=SCHEMA_CHECK_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._status = None
+        self._checked_at = 0.0
+
+    def status(self):
+        with self._lock:
+            if self._status is not None and (
+                self._status['pronto'] or time.monotonic() - self._checked_at < self.interval
+            ):
+                return self._status
+
+        esperada = head_revisions()
+        try:
+            with engine.connect() as connection:
+                atual = current_revisions(connection)
+            status = {"pronto": atual == esperada, "atual": sorted(atual), "esperada": sorted(esperada)}
+        except Exception as e:
+            print(f"Erro ao verificar a revisão do schema: {e}")
+            status = {"pronto": False, "atual": None, "esperada": sorted(esperada), "erro": "Banco de dados indisponível."}
+
+        with self._lock:
+            self._status = status
+            self._checked_at = time.monotonic()
+        return status
+
+
+schema_check = SchemaCheck()
+
+
+def upgrade_database():
+    from alembic import command
+
+    config = alembic_config()
+    with engine.connect() as connection:
+        tables = set(inspect(connection).get_table_names())
+
+    if not tables:
+        # Banco novo: as migrações antigas partem de tabelas que só o create_all criava,
+        # então o schema atual é criado a partir dos modelos e marcado como head.
+        print("Banco vazio: criando o schema a partir dos modelos e marcando a revisão head.")
+        Base.metadata.create_all(bind=engine)
+        command.stamp(config, 'head')
+    elif 'alembic_version' not in tables:
+        raise RuntimeError(
+            "O banco tem tabelas mas nenhuma revisão do Alembic. "
+            "Marque a revisão correspondente com 'alembic stamp <revisão>' antes de migrar."
+        )
+    else:
+        command.upgrade(config, 'head')
+
+
+if __name__ == '__main__':
+    upgrade_database()
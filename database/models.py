@@ -1,5 +1,5 @@
 from enum import Enum
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Numeric, Date, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Numeric, Date, Boolean, Index, text, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
@@ -17,6 +17,8 @@ class User(Base):
     hashed_password = Column(String(512), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Incrementado a cada escrita nos dados financeiros do usuário; usado como chave dos caches em memória
+    data_version = Column(Integer, nullable=False, default=0, server_default='0')
 
     dashboard_layout_order = Column(
         Text,
@@ -64,6 +66,22 @@ class User(Base):
             "dashboard_layout_order": layout_order,
         }
 
+class RefreshToken(Base):
+    # Um registro por refresh token emitido; tokens rotacionados de uma mesma sessão compartilham `familia`
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    jti = Column(String(36), unique=True, index=True, nullable=False)
+    familia = Column(String(36), index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    expira_em = Column(DateTime(timezone=True), nullable=False)
+    revogado_em = Column(DateTime(timezone=True), nullable=True)
+    substituido_por = Column(String(36), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<RefreshToken(id={self.id}, user_id={self.user_id}, revogado={self.revogado_em is not None})>"
+
 class Conta(Base):
     __tablename__ = "contas"
 
@@ -88,12 +106,12 @@ class Conta(Base):
         return {
             "id": self.id,
             "nome": self.nome,
-            "saldo_inicial": float(self.saldo_inicial),
-            "saldo_atual": float(self.saldo_atual),
+            "saldo_inicial": self.saldo_inicial,
+            "saldo_atual": self.saldo_atual,
             "tipo": self.tipo,
             "user_id": self.user_id,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
             "instituicao": self.instituicao,
             "observacoes": self.observacoes,
         }
@@ -136,6 +154,15 @@ class StatusTransacaoEnum(Enum):
 
 class Transacao(Base):
     __tablename__ = "transacoes"
+    __table_args__ = (
+        # Consultas por janela de vencimento da agenda (calendário, resumos)
+        Index('ix_transacoes_user_id_data_vencimento', 'user_id', 'data_vencimento'),
+        # Índice parcial: apenas os lançamentos ainda pendentes
+        Index(
+            'ix_transacoes_pendentes_user_id_data_vencimento', 'user_id', 'data_vencimento',
+            postgresql_where=text("status = 'PENDENTE'")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     valor = Column(Numeric(10, 2), nullable=False)
@@ -192,22 +219,23 @@ class Transacao(Base):
         )
 
     def to_dict(self, include_related=True):
+        # Valores crus (Decimal, datetime, Enum): a conversão fica com o provedor JSON da aplicação
         data_dict = {
             "id": self.id,
             "descricao": self.descricao,
-            "valor": float(self.valor),
-            "tipo": self.tipo.value if self.tipo else None,
-            "data": self.data.isoformat() if self.data else None,
+            "valor": self.valor,
+            "tipo": self.tipo,
+            "data": self.data,
             "conta_id": self.conta_id,
             "categoria_id": self.categoria_id,
             "user_id": self.user_id,
             "observacoes": self.observacoes,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "data_vencimento": self.data_vencimento.isoformat() if self.data_vencimento else None,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "data_vencimento": self.data_vencimento,
             "entidade": self.entidade,
-            "status": self.status.value if self.status else None,
-            "data_pagamento_recebimento": self.data_pagamento_recebimento.isoformat() if self.data_pagamento_recebimento else None,
+            "status": self.status,
+            "data_pagamento_recebimento": self.data_pagamento_recebimento,
             "parcelado": self.parcelado,
             "numero_parcela": self.numero_parcela,
             "total_parcelas": self.total_parcelas,
@@ -219,7 +247,7 @@ class Transacao(Base):
                     "id": self.conta.id,
                     "nome": self.conta.nome,
                     "tipo": self.conta.tipo,
-                    "saldo_atual": float(self.conta.saldo_atual)
+                    "saldo_atual": self.conta.saldo_atual
                 }
             if self.categoria:
                 data_dict['categoria'] = {
@@ -348,10 +376,12 @@ class MetaFinanceira(Base):
     valor_necessario = Column(Numeric(10, 2))
     valor_reservado = Column(Numeric(10, 2), default=Decimal('0.00'))
     conta_destino = Column(String(50))
+    conta_destino_id = Column(Integer, ForeignKey("contas.id"), nullable=True)
     atingido = Column(Boolean, default=False)
     data_meta = Column(Date)
 
     usuario = relationship("User", back_populates="metas_financeiras")
+    contribuicoes = relationship("ContribuicaoMeta", back_populates="meta", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<MetaFinanceira(id={self.id}, titulo='{self.titulo}', valor_necessario={self.valor_necessario})>"
@@ -365,12 +395,59 @@ class MetaFinanceira(Base):
             "valor_necessario": float(self.valor_necessario) if self.valor_necessario else None,
             "valor_reservado": float(self.valor_reservado) if self.valor_reservado else None,
             "conta_destino": self.conta_destino,
+            "conta_destino_id": self.conta_destino_id,
             "atingido": self.atingido,
             "data_meta": self.data_meta.isoformat() if self.data_meta else None,
         }
 
+class ContribuicaoMeta(Base):
+    __tablename__ = "contribuicoes_meta"
+    __table_args__ = (
+        Index('ix_contribuicoes_meta_meta_id_data', 'meta_id', 'data'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    meta_id = Column(Integer, ForeignKey("metas_financeiras.id", ondelete="CASCADE"), nullable=False)
+    usuario_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # Valores negativos representam retiradas da reserva
+    valor = Column(Numeric(10, 2), nullable=False)
+    data = Column(Date, server_default=func.now(), nullable=False)
+    conta_id = Column(Integer, ForeignKey("contas.id"), nullable=True)
+    transacao_id = Column(Integer, ForeignKey("transacoes.id", ondelete="SET NULL"), nullable=True)
+    observacoes = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    meta = relationship("MetaFinanceira", back_populates="contribuicoes")
+
+    def __repr__(self):
+        return f"<ContribuicaoMeta(id={self.id}, meta_id={self.meta_id}, valor={self.valor})>"
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "meta_id": self.meta_id,
+            "usuario_id": self.usuario_id,
+            "valor": float(self.valor),
+            "data": self.data.isoformat() if self.data else None,
+            "conta_id": self.conta_id,
+            "transacao_id": self.transacao_id,
+            "observacoes": self.observacoes,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
 class EstoquePessoal(Base):
     __tablename__ = "estoque_pessoal"
+    __table_args__ = (
+        # Reposição: itens ainda não comprados com estoque baixo ou com data necessária próxima
+        Index(
+            'ix_estoque_pessoal_pendentes_usuario_id_quantidade', 'usuario_id', 'quantidade',
+            postgresql_where=text("comprado IS NOT TRUE")
+        ),
+        Index(
+            'ix_estoque_pessoal_pendentes_usuario_id_data_necessaria', 'usuario_id', 'data_necessaria',
+            postgresql_where=text("comprado IS NOT TRUE")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     usuario_id = Column(Integer, ForeignKey("users.id"))
@@ -387,6 +464,7 @@ class EstoquePessoal(Base):
     observacoes = Column(Text)
 
     usuario = relationship("User", back_populates="estoque_pessoal")
+    movimentos = relationship("MovimentoEstoque", back_populates="estoque", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<EstoquePessoal(id={self.id}, nome='{self.nome}', quantidade={self.quantidade})>"
@@ -408,6 +486,26 @@ class EstoquePessoal(Base):
             "observacoes": self.observacoes,
         }
 
+class MovimentoEstoque(Base):
+    # Registro somente de inserção: cada alteração de quantidade de um item de estoque
+    __tablename__ = "movimentos_estoque"
+    __table_args__ = (
+        Index('ix_movimentos_estoque_usuario_id_estoque_id', 'usuario_id', 'estoque_id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    estoque_id = Column(Integer, ForeignKey("estoque_pessoal.id", ondelete="CASCADE"), nullable=False)
+    usuario_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Quantidade resultante e variação em relação à anterior (negativa = consumo)
+    quantidade = Column(Integer, nullable=False)
+    variacao = Column(Integer, nullable=False)
+    registrado_em = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    estoque = relationship("EstoquePessoal", back_populates="movimentos")
+
+    def __repr__(self):
+        return f"<MovimentoEstoque(id={self.id}, estoque_id={self.estoque_id}, variacao={self.variacao})>"
+
 class Produto(Base):
     __tablename__ = "produtos"
 
@@ -439,6 +537,10 @@ class Produto(Base):
 
 class HistoricoPrecoProduto(Base):
     __tablename__ = "historico_preco_produto"
+    __table_args__ = (
+        # Série temporal por produto: último preço, estatísticas por período e por local
+        Index('ix_historico_preco_produto_produto_id_data_registro', 'produto_id', 'data_registro'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     produto_id = Column(Integer, ForeignKey("produtos.id"), nullable=False)
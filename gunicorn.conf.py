@@ -0,0 +1,41 @@
+# personal_finance_api/gunicorn.conf.py
+#
+# Com preload_app o main.py (Flask, SQLAlchemy, modelos e rotas) é importado uma vez no master
+# e compartilhado pelos workers via copy-on-write. pandas, NumPy e Alembic não entram nessa
+# importação: cada worker os carrega no primeiro uso (importação/exportação, análises, migrações).
+# Nada que dependa de conexão pode atravessar o fork: o master descarta o pool antes de criar
+# os workers e cada worker começa com um pool vazio, conectando sob demanda.
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() in ('true', '1', 'yes')
+
+# Recicla cada worker após N requisições (com variação para não reiniciarem todos juntos)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+
+def when_ready(server):
+    # Executado no master depois do preload e antes do primeiro fork:
+    # fecha as conexões abertas durante a importação (aquecimento do pool)
+    if preload_app:
+        from database.db import engine
+
+        engine.dispose()
+
+
+def post_fork(server, worker):
+    from database.db import engine, warmup_pool
+
+    # Descarta qualquer pool herdado sem fechar os sockets, que pertencem ao master
+    engine.dispose(close=False)
+    try:
+        opened = warmup_pool()
+        server.log.info("Worker %s: pool de conexões aquecido com %s conexão(ões).", worker.pid, opened)
+    except Exception as e:
+        # O pool continua vazio e conecta na primeira requisição
+        server.log.warning("Worker %s: falha ao aquecer o pool de conexões: %s", worker.pid, e)
@@ -2,11 +2,10 @@ import os
 import traceback
 from flask import Flask, jsonify
 from dotenv import load_dotenv
-from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from werkzeug.exceptions import UnprocessableEntity
 
-from database.db import engine, Base, SessionLocal
+from database.db import SessionLocal, warmup_pool
 from database import models
 from routes.auth_routes import auth_bp
 from routes.account_routes import account_bp
@@ -19,10 +18,18 @@ from routes.goal_routes import goal_bp
 from routes.inventory_routes import inventory_bp
 from routes.agenda_accounts_routes import agenda_account_bp
 from routes.agenda_transactions_routes import agenda_transaction_bp
+from routes.agenda_insights_routes import agenda_insights_bp
+from routes.product_routes import product_bp
+from routes.internal_routes import internal_bp
+from services.refresh_tokens import is_token_revoked
+from services.rate_limit import init_rate_limiting, RequestCachedJWTManager
+from services.json_provider import get_json_provider_class
 
 load_dotenv()
 
 app = Flask(__name__)
+# orjson quando instalado: Decimal, date/datetime e Enum serializados sem conversões nos to_dict
+app.json = get_json_provider_class()(app)
 
 allowed_origins_str = os.getenv('ALLOWED_ORIGINS', 'https://financeapp-frontend.onrender.com')
 allowed_origins = [origin.strip() for origin in allowed_origins_str.split(',')]
@@ -35,23 +42,27 @@ app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'uma_chave_secreta_padrao_mui
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'super_secreta_jwt_para_dev')
 app.config['JWT_TOKEN_LOCATION'] = ['headers']
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = int(os.getenv('JWT_ACCESS_TOKEN_EXPIRES', 3600))
+app.config['JWT_REFRESH_TOKEN_EXPIRES'] = int(os.getenv('JWT_REFRESH_TOKEN_EXPIRES', 30 * 24 * 3600))
 app.config['JWT_COOKIE_SECURE'] = False
 app.config['JWT_COOKIE_CSRF_PROTECT'] = False
 
-jwt = JWTManager(app)
+jwt = RequestCachedJWTManager(app)
+init_rate_limiting(app)
 
-Base.metadata.create_all(bind=engine)
-print("DEBUG: Tabelas verificadas/criadas (se Base.metadata.create_all estiver ativo).")
+# O schema é responsabilidade do Alembic (python -m database.migrations na fase de release);
+# a aplicação não executa DDL ao iniciar. GET /internal/ready confere a revisão do banco.
 
-@jwt.user_lookup_loader
-def user_lookup_callback(_jwt_header, jwt_data):
-    identity = jwt_data["sub"]
-    db = SessionLocal()
-    try:
-        user = db.query(models.User).filter_by(id=int(identity)).first()
-        return user
-    finally:
-        db.close()
+try:
+    print(f"DEBUG: Pool de conexões aquecido com {warmup_pool()} conexão(ões).")
+except Exception as e:
+    print(f"AVISO: Falha ao aquecer o pool de conexões: {e}")
+
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(_jwt_header, jwt_payload):
+    return is_token_revoked(jwt_payload)
+
+# Sem user_lookup_loader: o flask_jwt_extended o executaria em toda requisição autenticada.
+# Quem precisar do usuário usa services.user_cache.current_user, carregado sob demanda.
 
 @app.errorhandler(UnprocessableEntity)
 def handle_unprocessable_entity(e):
@@ -78,6 +89,9 @@ app.register_blueprint(goal_bp)
 app.register_blueprint(inventory_bp)
 app.register_blueprint(agenda_account_bp)
 app.register_blueprint(agenda_transaction_bp)
+app.register_blueprint(agenda_insights_bp)
+app.register_blueprint(product_bp)
+app.register_blueprint(internal_bp)
 
 if __name__ == '__main__':
     print("DEBUG: Rodando Flask em modo de desenvolvimento (apenas para teste local).")
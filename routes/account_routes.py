@@ -4,6 +4,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 
 from database.db import SessionLocal
 from database.models import Conta, User, Transacao
+from services.data_version import bump_data_version
 from sqlalchemy.exc import IntegrityError
 from decimal import Decimal, InvalidOperation
 from datetime import datetime
@@ -48,6 +49,7 @@ def create_account():
             user_id=current_user_id
         )
         db.add(new_account)
+        bump_data_version(db, current_user_id)
         db.commit()
         db.refresh(new_account)
 
@@ -171,6 +173,7 @@ def update_account(account_id):
         conta.updated_at = datetime.now()
 
         db.add(conta)
+        bump_data_version(db, current_user_id)
         db.commit()
         db.refresh(conta)
 
@@ -212,6 +215,7 @@ def delete_account(account_id):
             return jsonify({"message": "Não é possível excluir a conta: existem transações associadas a ela."}), 409
 
         db.delete(conta)
+        bump_data_version(db, current_user_id)
         db.commit()
         return jsonify({"message": "Conta excluída com sucesso."}), 204
     except IntegrityError as e:
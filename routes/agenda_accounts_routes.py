@@ -6,6 +6,7 @@ from datetime import datetime
 
 from database.db import SessionLocal
 from database.models import Conta, User, Transacao 
+from services.data_version import bump_data_version
 
 agenda_account_bp = Blueprint('agenda_accounts', __name__, url_prefix='/agenda/accounts')
 
@@ -48,6 +49,7 @@ def create_agenda_account():
         )
 
         db.add(new_account)
+        bump_data_version(db, current_user_id)
         db.commit()
         db.refresh(new_account)
         return jsonify(new_account.to_dict()), 201
@@ -122,6 +124,7 @@ def update_agenda_account(account_id):
         conta.instituicao = instituicao
         conta.observacoes = observacoes
 
+        bump_data_version(db, current_user_id)
         db.commit()
         db.refresh(conta)
         return jsonify(conta.to_dict()), 200
@@ -151,6 +154,7 @@ def delete_agenda_account(account_id):
             return jsonify({"message": "Não é possível excluir a conta: existem transações associadas a ela."}), 409
 
         db.delete(conta)
+        bump_data_version(db, current_user_id)
         db.commit()
         return jsonify({"message": "Conta excluída com sucesso."}), 204
     except IntegrityError as e:
@@ -0,0 +1,47 @@
+# personal_finance_api/routes/agenda_insights_routes.py
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from database.db import SessionLocal
+from services.agenda_digest import compute_digest
+
+# Visões calculadas sobre a agenda financeira (projeções, resumos)
+agenda_insights_bp = Blueprint('agenda_insights', __name__, url_prefix='/agenda')
+
+@agenda_insights_bp.route('/forecast', methods=['GET'])
+@jwt_required()
+def get_cash_flow_forecast():
+    # Importado sob demanda: carrega NumPy e o cache colunar de transações
+    from services.forecast import project_cash_flow, MAX_FORECAST_MONTHS
+
+    current_user_id = get_jwt_identity()
+
+    try:
+        months = int(request.args.get('months', 3))
+    except ValueError:
+        return jsonify({"message": "Parâmetro 'months' inválido."}), 400
+    if months < 1 or months > MAX_FORECAST_MONTHS:
+        return jsonify({"message": f"O parâmetro 'months' deve estar entre 1 e {MAX_FORECAST_MONTHS}."}), 400
+
+    db = SessionLocal()
+    try:
+        forecast = project_cash_flow(db, current_user_id, months)
+        return jsonify(forecast), 200
+    except Exception as e:
+        print(f"Erro ao projetar fluxo de caixa: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao projetar o fluxo de caixa."}), 500
+    finally:
+        db.close()
+
+@agenda_insights_bp.route('/digest', methods=['GET'])
+@jwt_required()
+def get_agenda_digest():
+    current_user_id = get_jwt_identity()
+    db = SessionLocal()
+    try:
+        return jsonify(compute_digest(db, current_user_id)), 200
+    except Exception as e:
+        print(f"Erro ao calcular resumo de vencimentos: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao calcular o resumo de vencimentos."}), 500
+    finally:
+        db.close()
@@ -10,6 +10,8 @@ from decimal import Decimal, InvalidOperation
 from database.db import SessionLocal
 # Importe os modelos que você definiu em models.py
 from database.models import Transacao, Conta, User, TipoTransacaoEnum, StatusTransacaoEnum
+from services.data_version import bump_data_version
+from services.columnar import COLUMNAR_FORMATS, TRANSACTION_COLUMNS, requested_format, invalid_format_response, columnar_response
 
 agenda_transaction_bp = Blueprint('agenda_transactions', __name__, url_prefix='/agenda/transactions')
 
@@ -98,6 +100,7 @@ def create_agenda_transacao():
         )
 
         db.add(new_transacao)
+        bump_data_version(db, current_user_id)
         db.commit()
         db.refresh(new_transacao)
 
@@ -108,6 +111,7 @@ def create_agenda_transacao():
             elif new_transacao.tipo == TipoTransacaoEnum.DESPESA.value: # Comparar com o valor da Enum
                 conta.saldo_atual -= new_transacao.valor
             db.add(conta)
+            bump_data_version(db, current_user_id)
             db.commit() # Commit para salvar a atualização da conta
             db.refresh(conta)
 
@@ -127,25 +131,52 @@ def create_agenda_transacao():
     finally:
         db.close()
 
+# Janela máxima aceita pela consulta de calendário (from/to)
+MAX_CALENDAR_RANGE_DAYS = 366
+
+def _agenda_dict(t):
+    t_dict = t.to_dict()
+    t_dict['nome_conta'] = t.conta.nome if t.conta else None
+    return t_dict
+
+def _parse_status_list(status_str):
+    # Aceita um status ou vários separados por vírgula (ex.: 'PENDENTE,PAGO')
+    return [StatusTransacaoEnum[s.strip().upper()] for s in status_str.split(',') if s.strip()]
+
 @agenda_transaction_bp.route('', methods=['GET'])
 @jwt_required()
 def get_agenda_transacoes():
     current_user_id = get_jwt_identity()
+    from_str = request.args.get('from')
+    to_str = request.args.get('to')
+    status_str = request.args.get('status')
+
+    status_list = None
+    if status_str:
+        try:
+            status_list = _parse_status_list(status_str)
+        except KeyError:
+            return jsonify({"message": "Status de transação inválido."}), 400
+
+    if from_str or to_str:
+        return _get_agenda_calendar(current_user_id, from_str, to_str, status_list)
+
+    fmt = requested_format()
+    if fmt is not None:
+        if fmt not in COLUMNAR_FORMATS:
+            return invalid_format_response(fmt)
+        return _get_agenda_columnar(current_user_id, status_list, fmt)
+
     db = SessionLocal()
     try:
-        transacoes = db.query(Transacao)\
-                       .filter_by(user_id=current_user_id)\
-                       .options(joinedload(Transacao.conta))\
-                       .order_by(Transacao.data_vencimento.asc()).all()
+        query = db.query(Transacao)\
+                  .filter_by(user_id=current_user_id)\
+                  .options(joinedload(Transacao.conta))
+        if status_list:
+            query = query.filter(Transacao.status.in_(status_list))
+        transacoes = query.order_by(Transacao.data_vencimento.asc()).all()
 
-        transacoes_data = []
-        for t in transacoes:
-            t_dict = t.to_dict()
-            if t.conta:
-                t_dict['nome_conta'] = t.conta.nome
-            else:
-                t_dict['nome_conta'] = None
-            transacoes_data.append(t_dict)
+        transacoes_data = [_agenda_dict(t) for t in transacoes]
 
         return jsonify(transacoes_data), 200
     except Exception as e:
@@ -154,6 +185,86 @@ def get_agenda_transacoes():
     finally:
         db.close()
 
+def _get_agenda_columnar(current_user_id, status_list, fmt):
+    columns = TRANSACTION_COLUMNS + (Conta.nome.label('nome_conta'),)
+    db = SessionLocal()
+    try:
+        query = db.query(*columns)\
+                  .outerjoin(Conta, Conta.id == Transacao.conta_id)\
+                  .filter(Transacao.user_id == current_user_id)
+        if status_list:
+            query = query.filter(Transacao.status.in_(status_list))
+        rows = query.order_by(Transacao.data_vencimento.asc()).all()
+        return columnar_response(columns, rows, fmt)
+    except Exception as e:
+        print(f"Ocorreu um erro inesperado ao buscar transações da agenda: {e}")
+        return jsonify({"message": f"Ocorreu um erro interno: {str(e)}"}), 500
+    finally:
+        db.close()
+
+def _get_agenda_calendar(current_user_id, from_str, to_str, status_list):
+    if not from_str or not to_str:
+        return jsonify({"message": "Os parâmetros 'from' e 'to' devem ser informados juntos."}), 400
+    try:
+        start = datetime.strptime(from_str, '%Y-%m-%d').date()
+        end = datetime.strptime(to_str, '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({"message": "Formato de data inválido. Use YYYY-MM-DD."}), 400
+    if end < start:
+        return jsonify({"message": "A data final deve ser posterior à data inicial."}), 400
+    if (end - start).days > MAX_CALENDAR_RANGE_DAYS:
+        return jsonify({"message": f"O intervalo não pode ultrapassar {MAX_CALENDAR_RANGE_DAYS} dias."}), 400
+
+    db = SessionLocal()
+    try:
+        # Varredura por intervalo em ix_transacoes_user_id_data_vencimento
+        # (ou no índice parcial de pendentes quando status=PENDENTE)
+        query = db.query(Transacao)\
+                  .filter(
+                      Transacao.user_id == current_user_id,
+                      Transacao.data_vencimento >= start,
+                      Transacao.data_vencimento <= end
+                  )\
+                  .options(joinedload(Transacao.conta), joinedload(Transacao.categoria))
+        if status_list:
+            query = query.filter(Transacao.status.in_(status_list))
+        transacoes = query.order_by(Transacao.data_vencimento.asc(), Transacao.id.asc()).all()
+
+        # Totais por dia calculados sobre as linhas já carregadas (sem nova ida ao banco)
+        totais = {}
+        for t in transacoes:
+            dia = totais.setdefault(t.data_vencimento, {
+                "receitas": Decimal('0.00'), "despesas": Decimal('0.00'), "quantidade": 0
+            })
+            if t.tipo == TipoTransacaoEnum.RECEITA:
+                dia["receitas"] += t.valor
+            else:
+                dia["despesas"] += t.valor
+            dia["quantidade"] += 1
+
+        totais_por_dia = [
+            {
+                "data": dia.isoformat(),
+                "receitas": float(valores["receitas"]),
+                "despesas": float(valores["despesas"]),
+                "saldo": float(valores["receitas"] - valores["despesas"]),
+                "quantidade": valores["quantidade"],
+            }
+            for dia, valores in totais.items()
+        ]
+
+        return jsonify({
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "transacoes": [_agenda_dict(t) for t in transacoes],
+            "totais_por_dia": totais_por_dia,
+        }), 200
+    except Exception as e:
+        print(f"Ocorreu um erro inesperado ao buscar o calendário da agenda: {e}")
+        return jsonify({"message": f"Ocorreu um erro interno: {str(e)}"}), 500
+    finally:
+        db.close()
+
 @agenda_transaction_bp.route('/<int:transaction_id>', methods=['GET'])
 @jwt_required()
 def get_agenda_transacao(transaction_id):
@@ -280,6 +391,7 @@ def update_agenda_transacao(transaction_id):
                 conta_nova.saldo_atual -= transacao.valor
             db.add(conta_nova)
 
+        bump_data_version(db, current_user_id)
         db.commit() # Commit final para persistir as atualizações de saldo das contas
         db.refresh(transacao)
         # Opcional: refresh nas contas se precisar dos objetos atualizados depois
@@ -324,6 +436,7 @@ def delete_agenda_transacao(transaction_id):
             db.refresh(conta)
 
         db.delete(transacao)
+        bump_data_version(db, current_user_id)
         db.commit() # Commit para salvar a deleção da transação
 
         return jsonify({"message": "Transação excluída com sucesso."}), 204
@@ -1,12 +1,17 @@
 # personal_finance_api/routes/auth_routes.py
 
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from datetime import timedelta
 
 from database.db import SessionLocal
-from database.models import User  # Importa o modelo User
+from database.models import User, RefreshToken  # Importa o modelo User
+from services.password_hashing import hash_password, verify_password, needs_rehash, HashingBusyError
+from services.refresh_tokens import (
+    issue_access_token, issue_refresh_token, rotate_refresh_token, revoke_family,
+    RefreshTokenError, RefreshTokenReuseError
+)
+from services.user_cache import current_user, user_cache
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
@@ -30,7 +35,7 @@ def register_user():
         if existing_user_email:
             return jsonify({"message": "Email already registered"}), 409
 
-        hashed_password = generate_password_hash(password)
+        hashed_password = hash_password(password)
         new_user = User(username=username, email=email, hashed_password=hashed_password)
 
         db.add(new_user)
@@ -38,6 +43,9 @@ def register_user():
         db.refresh(new_user)
 
         return jsonify({"message": "User registered successfully", "user_id": new_user.id}), 201
+    except HashingBusyError as e:
+        db.rollback()
+        return jsonify({"message": str(e)}), 503
     except Exception as e:
         db.rollback()
         print(f"Erro ao registrar usuário: {e}")
@@ -62,48 +70,101 @@ def login_user():
         if not user:
             return jsonify({"message": "Credenciais inválidas"}), 401
 
-        if not check_password_hash(user.hashed_password, password):
+        if not verify_password(user.hashed_password, password):
             return jsonify({"message": "Credenciais inválidas"}), 401
 
-        # ✅ Correção: convertendo o ID do usuário para string
-        access_token = create_access_token(identity=str(user.id))
+        # Atualiza o hash quando o método/custo configurado mudou (a senha em claro só existe aqui)
+        if needs_rehash(user.hashed_password):
+            user.hashed_password = hash_password(password)
+            db.commit()
+            user_cache.invalidate(user.id)
+
+        # Refresh token de longa duração: renovar a sessão em /auth/refresh não exige verificar a senha
+        refresh_token, _, familia = issue_refresh_token(db, user.id)
+        # O access token leva a família da sessão, para ser barrado logo após o logout
+        access_token = issue_access_token(user.id, familia)
+        db.commit()
 
         return jsonify({
             "access_token": access_token,
+            "refresh_token": refresh_token,
             "user": {
                 "id": user.id,
                 "username": user.username,
                 "email": user.email
             }
         }), 200
+    except HashingBusyError as e:
+        db.rollback()
+        return jsonify({"message": str(e)}), 503
     except Exception as e:
+        db.rollback()
         print(f"Erro ao logar usuário: {e}")
         return jsonify({"message": f"An error occurred: {str(e)}"}), 500
     finally:
         db.close()
 
 
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh_access_token():
+    db = SessionLocal()
+    try:
+        payload = get_jwt()
+        refresh_token, familia = rotate_refresh_token(db, payload)
+        db.commit()
+        return jsonify({
+            "access_token": issue_access_token(payload['sub'], familia),
+            "refresh_token": refresh_token,
+        }), 200
+    except RefreshTokenReuseError as e:
+        # A revogação da família precisa ser gravada mesmo com a recusa
+        db.commit()
+        return jsonify({"message": str(e)}), 401
+    except RefreshTokenError as e:
+        db.rollback()
+        return jsonify({"message": str(e)}), 401
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao renovar token: {e}")
+        return jsonify({"message": "Erro interno do servidor."}), 500
+    finally:
+        db.close()
+
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(refresh=True)
+def logout_user():
+    # Revoga o refresh token apresentado e todos os que foram rotacionados a partir dele.
+    # Access tokens já emitidos continuam válidos até expirar (JWT_ACCESS_TOKEN_EXPIRES).
+    db = SessionLocal()
+    try:
+        payload = get_jwt()
+        row = db.query(RefreshToken.familia, RefreshToken.user_id).filter_by(jti=payload['jti']).first()
+        if row and str(row.user_id) == str(payload['sub']):
+            revoke_family(db, row.familia)
+            db.commit()
+        return jsonify({"message": "Sessão encerrada."}), 200
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao encerrar sessão: {e}")
+        return jsonify({"message": "Erro interno do servidor."}), 500
+    finally:
+        db.close()
+
+
 @auth_bp.route('/user', methods=['GET'])
 @jwt_required()
 def get_current_user_data():
-    user_id = get_jwt_identity()
-
-    db = SessionLocal()
     try:
-        user = db.query(User).filter_by(id=int(user_id)).first()
+        user = current_user._get_current_object()
         if not user:
             return jsonify({"message": "Usuário não encontrado."}), 404
 
-        return jsonify({
-            "id": user.id,
-            "username": user.username,
-            "email": user.email
-        }), 200
+        return jsonify(user), 200
     except Exception as e:
         print(f"Erro ao buscar dados do usuário: {e}")
         return jsonify({"message": "Erro interno do servidor."}), 500
-    finally:
-        db.close()
 
 
 @auth_bp.route('/protected', methods=['GET'])
@@ -7,6 +7,8 @@ from decimal import Decimal, InvalidOperation
 
 from database.db import SessionLocal
 from database.models import ContaAPagar, User
+from services.data_version import bump_data_version
+from services.bill_schedule import iter_occurrences_for_bills, add_months
 
 bill_bp = Blueprint('bills', __name__, url_prefix='/bills')
 
@@ -51,6 +53,7 @@ def create_bill():
             recorrente=recorrente
         )
         db.add(new_bill)
+        bump_data_version(db, current_user_id)
         db.commit()
         db.refresh(new_bill)
         return jsonify(new_bill.to_dict()), 201
@@ -78,6 +81,61 @@ def get_bills():
     finally:
         db.close()
 
+# Janela máxima aceita em /bills/occurrences (contas recorrentes sem data_fim são infinitas)
+MAX_OCCURRENCE_WINDOW_MONTHS = 60
+
+@bill_bp.route('/occurrences', methods=['GET'])
+@jwt_required()
+def get_bill_occurrences():
+    current_user_id = get_jwt_identity()
+    from_str = request.args.get('from')
+    to_str = request.args.get('to')
+
+    if not from_str or not to_str:
+        return jsonify({"message": "Os parâmetros 'from' e 'to' são obrigatórios."}), 400
+
+    try:
+        start = datetime.fromisoformat(from_str).date()
+        end = datetime.fromisoformat(to_str).date()
+    except ValueError:
+        return jsonify({"message": "Formato de data inválido. Use YYYY-MM-DD."}), 400
+
+    if end < start:
+        return jsonify({"message": "A data final deve ser posterior à data inicial."}), 400
+    if end > add_months(start, MAX_OCCURRENCE_WINDOW_MONTHS):
+        return jsonify({"message": f"O intervalo não pode ultrapassar {MAX_OCCURRENCE_WINDOW_MONTHS} meses."}), 400
+
+    db = SessionLocal()
+    try:
+        # Uma única consulta para todas as contas do usuário; a expansão é feita sob demanda
+        bills = db.query(ContaAPagar).filter_by(usuario_id=current_user_id).all()
+
+        occurrences = []
+        total = Decimal('0.00')
+        for bill, numero_parcela, occurrence, valor in iter_occurrences_for_bills(bills, start, end):
+            occurrences.append({
+                "conta_a_pagar_id": bill.id,
+                "descricao": bill.descricao,
+                "numero_parcela": numero_parcela,
+                "total_parcelas": None if bill.recorrente else (bill.numero_parcelas or 1),
+                "recorrente": bill.recorrente,
+                "data": occurrence.isoformat(),
+                "valor": float(valor),
+            })
+            total += valor
+
+        return jsonify({
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "total": float(total),
+            "ocorrencias": occurrences,
+        }), 200
+    except Exception as e:
+        print(f"Erro ao expandir ocorrências de contas a pagar: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao buscar as ocorrências das contas a pagar."}), 500
+    finally:
+        db.close()
+
 @bill_bp.route('/<int:bill_id>', methods=['GET'])
 @jwt_required()
 def get_bill(bill_id):
@@ -148,6 +206,7 @@ def update_bill(bill_id):
         if recorrente is not None:
             bill.recorrente = recorrente
 
+        bump_data_version(db, current_user_id)
         db.commit()
         db.refresh(bill)
         return jsonify(bill.to_dict()), 200
@@ -172,6 +231,7 @@ def delete_bill(bill_id):
             return jsonify({"message": "Conta a pagar não encontrada ou não pertence ao usuário."}), 404
 
         db.delete(bill)
+        bump_data_version(db, current_user_id)
         db.commit()
         return jsonify({"message": "Conta a pagar excluída com sucesso."}), 204
     except Exception as e:
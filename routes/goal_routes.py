@@ -1,15 +1,20 @@
 # personal_finance_api/routes/goal_routes.py
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func, case
 from sqlalchemy.exc import IntegrityError
-from datetime import datetime
+from datetime import datetime, date, timedelta
 from decimal import Decimal, InvalidOperation
 
 from database.db import SessionLocal
-from database.models import MetaFinanceira, User
+from database.models import MetaFinanceira, ContribuicaoMeta, Conta, Transacao, User
+from services.data_version import bump_data_version
 
 goal_bp = Blueprint('goals', __name__, url_prefix='/goals')
 
+# Projeções de conclusão além deste horizonte saem como null (ritmos muito baixos)
+MAX_PROJECTION_DAYS = 100 * 365
+
 @goal_bp.route('', methods=['POST'])
 @jwt_required()
 def create_goal():
@@ -21,6 +26,7 @@ def create_goal():
     valor_necessario = data.get('valor_necessario')
     valor_reservado = data.get('valor_reservado', 0.00)
     conta_destino = data.get('conta_destino')
+    conta_destino_id = data.get('conta_destino_id')
     data_meta_str = data.get('data_meta')
 
     if not all([titulo, valor_necessario, data_meta_str]):
@@ -38,6 +44,11 @@ def create_goal():
     
     db = SessionLocal()
     try:
+        if conta_destino_id is not None:
+            conta = db.query(Conta).filter_by(id=conta_destino_id, user_id=current_user_id).first()
+            if not conta:
+                return jsonify({"message": "Conta de destino não encontrada ou não pertence ao usuário."}), 404
+
         new_goal = MetaFinanceira(
             usuario_id=current_user_id,
             titulo=titulo,
@@ -45,9 +56,22 @@ def create_goal():
             valor_necessario=valor_necessario,
             valor_reservado=valor_reservado,
             conta_destino=conta_destino,
+            conta_destino_id=conta_destino_id,
             data_meta=data_meta
         )
         db.add(new_goal)
+        if valor_reservado:
+            # Saldo inicial vira a primeira contribuição, para o histórico somar o valor reservado
+            db.flush()
+            db.add(ContribuicaoMeta(
+                meta_id=new_goal.id,
+                usuario_id=current_user_id,
+                valor=valor_reservado,
+                data=date.today(),
+                conta_id=conta_destino_id,
+                observacoes="Valor reservado inicial",
+            ))
+        bump_data_version(db, current_user_id)
         db.commit()
         db.refresh(new_goal)
         return jsonify(new_goal.to_dict()), 201
@@ -108,6 +132,7 @@ def update_goal(goal_id):
         valor_necessario = data.get('valor_necessario')
         valor_reservado = data.get('valor_reservado')
         conta_destino = data.get('conta_destino')
+        conta_destino_id = data.get('conta_destino_id')
         atingido = data.get('atingido')
         data_meta_str = data.get('data_meta')
 
@@ -122,15 +147,23 @@ def update_goal(goal_id):
                     return jsonify({"message": "Valor necessário não pode ser negativo."}), 400
             except InvalidOperation:
                 return jsonify({"message": "Valor necessário inválido."}), 400
+        ajuste_reservado = None
         if valor_reservado is not None:
             try:
-                goal.valor_reservado = Decimal(str(valor_reservado))
-                if goal.valor_reservado < 0:
-                    return jsonify({"message": "Valor reservado não pode ser negativo."}), 400
+                novo_reservado = Decimal(str(valor_reservado))
             except InvalidOperation:
                 return jsonify({"message": "Valor reservado inválido."}), 400
+            if novo_reservado < 0:
+                return jsonify({"message": "Valor reservado não pode ser negativo."}), 400
+            # O valor reservado é mantido pelas contribuições: a edição vira uma contribuição de ajuste
+            ajuste_reservado = novo_reservado - (goal.valor_reservado or Decimal('0.00'))
         if conta_destino is not None:
             goal.conta_destino = conta_destino
+        if conta_destino_id is not None:
+            conta = db.query(Conta).filter_by(id=conta_destino_id, user_id=current_user_id).first()
+            if not conta:
+                return jsonify({"message": "Conta de destino não encontrada ou não pertence ao usuário."}), 404
+            goal.conta_destino_id = conta_destino_id
         if atingido is not None:
             goal.atingido = atingido
         if data_meta_str is not None:
@@ -141,6 +174,20 @@ def update_goal(goal_id):
         elif data_meta_str is None: # Se enviado como None, limpa
             goal.data_meta = None
 
+        if ajuste_reservado:
+            db.add(ContribuicaoMeta(
+                meta_id=goal.id,
+                usuario_id=current_user_id,
+                valor=ajuste_reservado,
+                data=date.today(),
+                conta_id=goal.conta_destino_id,
+                observacoes="Ajuste manual do valor reservado",
+            ))
+            # Grava as demais alterações antes, para que 'atingido' seja recalculado sobre elas
+            db.flush()
+            _apply_contribution(db, goal.id, ajuste_reservado)
+
+        bump_data_version(db, current_user_id)
         db.commit()
         db.refresh(goal)
         return jsonify(goal.to_dict()), 200
@@ -165,6 +212,7 @@ def delete_goal(goal_id):
             return jsonify({"message": "Meta financeira não encontrada ou não pertence ao usuário."}), 404
 
         db.delete(goal)
+        bump_data_version(db, current_user_id)
         db.commit()
         return jsonify({"message": "Meta financeira excluída com sucesso."}), 204
     except Exception as e:
@@ -173,3 +221,234 @@ def delete_goal(goal_id):
         return jsonify({"message": "Ocorreu um erro interno ao excluir a meta financeira."}), 500
     finally:
         db.close()
+
+
+# --- Contribuições para metas ---
+
+def _apply_contribution(db, goal_id, valor):
+    # Atualização incremental no próprio banco (sem ler-modificar-gravar em Python),
+    # segura contra contribuições concorrentes para a mesma meta.
+    novo_reservado = func.coalesce(MetaFinanceira.valor_reservado, 0) + valor
+    db.query(MetaFinanceira).filter(MetaFinanceira.id == goal_id).update({
+        MetaFinanceira.valor_reservado: novo_reservado,
+        MetaFinanceira.atingido: case((novo_reservado >= MetaFinanceira.valor_necessario, True), else_=False),
+    }, synchronize_session=False)
+
+@goal_bp.route('/<int:goal_id>/contributions', methods=['POST'])
+@jwt_required()
+def create_goal_contribution(goal_id):
+    current_user_id = get_jwt_identity()
+    data = request.get_json()
+
+    valor = data.get('valor')
+    data_str = data.get('data')
+    conta_id = data.get('conta_id')
+    transacao_id = data.get('transacao_id')
+    observacoes = data.get('observacoes')
+
+    if valor is None and transacao_id is None:
+        return jsonify({"message": "Informe o valor da contribuição ou a transação vinculada."}), 400
+
+    try:
+        valor = Decimal(str(valor)) if valor is not None else None
+        data_contribuicao = datetime.fromisoformat(data_str).date() if data_str else date.today()
+    except (ValueError, InvalidOperation):
+        return jsonify({"message": "Dados de valor ou data inválidos."}), 400
+
+    if valor is not None and valor == 0:
+        return jsonify({"message": "O valor da contribuição não pode ser zero."}), 400
+
+    db = SessionLocal()
+    try:
+        goal = db.query(MetaFinanceira).filter_by(id=goal_id, usuario_id=current_user_id).first()
+        if not goal:
+            return jsonify({"message": "Meta financeira não encontrada ou não pertence ao usuário."}), 404
+
+        if transacao_id is not None:
+            transacao = db.query(Transacao).filter_by(id=transacao_id, user_id=current_user_id).first()
+            if not transacao:
+                return jsonify({"message": "Transação não encontrada ou não pertence ao usuário."}), 404
+            # A transação vinculada fornece os valores padrão da contribuição
+            if valor is None:
+                valor = transacao.valor
+            if conta_id is None:
+                conta_id = transacao.conta_id
+            if not data_str and transacao.data:
+                data_contribuicao = transacao.data.date()
+
+        if conta_id is None:
+            conta_id = goal.conta_destino_id
+        elif not db.query(Conta.id).filter_by(id=conta_id, user_id=current_user_id).first():
+            return jsonify({"message": "Conta não encontrada ou não pertence ao usuário."}), 404
+
+        contribuicao = ContribuicaoMeta(
+            meta_id=goal.id,
+            usuario_id=current_user_id,
+            valor=valor,
+            data=data_contribuicao,
+            conta_id=conta_id,
+            transacao_id=transacao_id,
+            observacoes=observacoes
+        )
+        db.add(contribuicao)
+        _apply_contribution(db, goal.id, valor)
+        bump_data_version(db, current_user_id)
+        db.commit()
+        db.refresh(contribuicao)
+        db.refresh(goal)
+        return jsonify({"contribuicao": contribuicao.to_dict(), "meta": goal.to_dict()}), 201
+    except IntegrityError:
+        db.rollback()
+        return jsonify({"message": "Erro ao registrar contribuição. Verifique os dados fornecidos."}), 400
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao registrar contribuição para meta: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao registrar a contribuição."}), 500
+    finally:
+        db.close()
+
+@goal_bp.route('/<int:goal_id>/contributions', methods=['GET'])
+@jwt_required()
+def get_goal_contributions(goal_id):
+    current_user_id = get_jwt_identity()
+    db = SessionLocal()
+    try:
+        contribuicoes = db.query(ContribuicaoMeta)\
+                          .filter_by(meta_id=goal_id, usuario_id=current_user_id)\
+                          .order_by(ContribuicaoMeta.data.desc(), ContribuicaoMeta.id.desc()).all()
+        return jsonify([c.to_dict() for c in contribuicoes]), 200
+    except Exception as e:
+        print(f"Erro ao buscar contribuições da meta: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao buscar as contribuições."}), 500
+    finally:
+        db.close()
+
+@goal_bp.route('/contributions/<int:contribution_id>', methods=['DELETE'])
+@jwt_required()
+def delete_goal_contribution(contribution_id):
+    current_user_id = get_jwt_identity()
+    db = SessionLocal()
+    try:
+        contribuicao = db.query(ContribuicaoMeta).filter_by(id=contribution_id, usuario_id=current_user_id).first()
+        if not contribuicao:
+            return jsonify({"message": "Contribuição não encontrada ou não pertence ao usuário."}), 404
+
+        _apply_contribution(db, contribuicao.meta_id, -contribuicao.valor)
+        db.delete(contribuicao)
+        bump_data_version(db, current_user_id)
+        db.commit()
+        return jsonify({"message": "Contribuição excluída com sucesso."}), 204
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao excluir contribuição: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao excluir a contribuição."}), 500
+    finally:
+        db.close()
+
+# Janela usada para medir o ritmo recente de contribuições
+PACE_WINDOW_DAYS = 90
+
+@goal_bp.route('/progress', methods=['GET'])
+@jwt_required()
+def get_goals_progress():
+    current_user_id = get_jwt_identity()
+    today = date.today()
+    window_start = today - timedelta(days=PACE_WINDOW_DAYS)
+    db = SessionLocal()
+    try:
+        agregado = db.query(
+            ContribuicaoMeta.meta_id.label('meta_id'),
+            func.count(ContribuicaoMeta.id).label('quantidade'),
+            func.min(ContribuicaoMeta.data).label('primeira'),
+            func.max(ContribuicaoMeta.data).label('ultima'),
+            func.sum(case((ContribuicaoMeta.data >= window_start, ContribuicaoMeta.valor), else_=0)).label('recente'),
+        ).filter(ContribuicaoMeta.usuario_id == current_user_id)\
+         .group_by(ContribuicaoMeta.meta_id).subquery()
+
+        # Metas e agregados das contribuições em uma única instrução SQL
+        rows = db.query(
+            MetaFinanceira,
+            agregado.c.quantidade,
+            agregado.c.primeira,
+            agregado.c.ultima,
+            agregado.c.recente,
+        ).outerjoin(agregado, agregado.c.meta_id == MetaFinanceira.id)\
+         .filter(MetaFinanceira.usuario_id == current_user_id)\
+         .order_by(MetaFinanceira.data_meta.asc(), MetaFinanceira.id.asc()).all()
+
+        progresso = []
+        for goal, quantidade, primeira, ultima, recente in rows:
+            necessario = goal.valor_necessario or Decimal('0.00')
+            reservado = goal.valor_reservado or Decimal('0.00')
+            restante = max(necessario - reservado, Decimal('0.00'))
+
+            # Ritmo mensal: contribuições da janela recente, proporcional ao tempo decorrido
+            ritmo_mensal = None
+            if primeira is not None:
+                dias = max((today - max(primeira, window_start)).days, 30)
+                ritmo_mensal = (recente or Decimal('0.00')) * 30 / dias
+
+            data_prevista = None
+            if restante == 0:
+                data_prevista = (ultima or today).isoformat()
+            elif ritmo_mensal and ritmo_mensal > 0:
+                dias_previstos = restante / ritmo_mensal * 30
+                if dias_previstos < MAX_PROJECTION_DAYS:
+                    data_prevista = (today + timedelta(days=int(dias_previstos) + 1)).isoformat()
+
+            ritmo_necessario = None
+            if goal.data_meta and restante > 0:
+                meses_restantes = max((goal.data_meta - today).days, 1) / Decimal(30)
+                ritmo_necessario = restante / meses_restantes
+
+            progresso.append({
+                **goal.to_dict(),
+                "percentual": float(reservado / necessario * 100) if necessario else None,
+                "valor_restante": float(restante),
+                "quantidade_contribuicoes": quantidade or 0,
+                "ultima_contribuicao": ultima.isoformat() if ultima else None,
+                "ritmo_mensal": round(float(ritmo_mensal), 2) if ritmo_mensal is not None else None,
+                "ritmo_mensal_necessario": round(float(ritmo_necessario), 2) if ritmo_necessario is not None else None,
+                "data_prevista_conclusao": data_prevista,
+                "no_prazo": (data_prevista is not None and goal.data_meta is not None
+                             and data_prevista <= goal.data_meta.isoformat()),
+            })
+
+        return jsonify(progresso), 200
+    except Exception as e:
+        print(f"Erro ao calcular progresso das metas: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao calcular o progresso das metas."}), 500
+    finally:
+        db.close()
+
+@goal_bp.route('/<int:goal_id>/simulate', methods=['GET'])
+@jwt_required()
+def simulate_goal_attainment(goal_id):
+    from services.goal_simulation import simulate_goal, InsufficientHistoryError, SimulationHorizonError, MAX_PATHS
+
+    current_user_id = get_jwt_identity()
+
+    try:
+        n_paths = int(request.args.get('paths', 5000))
+        fracao = float(request.args.get('fracao', 1.0))
+    except ValueError:
+        return jsonify({"message": "Parâmetros 'paths' ou 'fracao' inválidos."}), 400
+    if n_paths < 100 or n_paths > MAX_PATHS:
+        return jsonify({"message": f"O parâmetro 'paths' deve estar entre 100 e {MAX_PATHS}."}), 400
+    if fracao <= 0 or fracao > 1:
+        return jsonify({"message": "O parâmetro 'fracao' deve estar entre 0 e 1."}), 400
+
+    db = SessionLocal()
+    try:
+        goal = db.query(MetaFinanceira).filter_by(id=goal_id, usuario_id=current_user_id).first()
+        if not goal:
+            return jsonify({"message": "Meta financeira não encontrada ou não pertence ao usuário."}), 404
+
+        return jsonify(simulate_goal(db, current_user_id, goal, n_paths=n_paths, fracao=fracao)), 200
+    except (InsufficientHistoryError, SimulationHorizonError) as e:
+        return jsonify({"message": str(e)}), 400
+    except Exception as e:
+        print(f"Erro ao simular meta financeira: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao simular a meta financeira."}), 500
+    finally:
+        db.close()
@@ -0,0 +1,43 @@
+# personal_finance_api/routes/internal_routes.py
+import hmac
+import os
+from functools import wraps
+
+from flask import Blueprint, request, jsonify
+
+from database.db import pool_stats
+from database.migrations import schema_check
+
+internal_bp = Blueprint('internal', __name__, url_prefix='/internal')
+
+# Sem INTERNAL_API_TOKEN definido as rotas internas respondem 404
+INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN')
+
+def internal_token_required(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = request.headers.get('X-Internal-Token', '')
+        if not INTERNAL_API_TOKEN:
+            return jsonify({"message": "Não encontrado."}), 404
+        if not hmac.compare_digest(token.encode(), INTERNAL_API_TOKEN.encode()):
+            return jsonify({"message": "Token interno inválido."}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+@internal_bp.route('/pool', methods=['GET'])
+@internal_token_required
+def get_pool_stats():
+    from services.transaction_cache import transaction_cache
+
+    # Métricas deste processo (cada worker gunicorn tem seu próprio pool)
+    return jsonify({
+        "pid": os.getpid(),
+        "pool": pool_stats(),
+        "transaction_cache": transaction_cache.stats(),
+    }), 200
+
+@internal_bp.route('/ready', methods=['GET'])
+def readiness():
+    # Sonda de prontidão (sem token): 503 enquanto o banco não estiver na revisão head do Alembic
+    status = schema_check.status()
+    return jsonify(status), 200 if status["pronto"] else 503
@@ -1,12 +1,16 @@
 # personal_finance_api/routes/inventory_routes.py
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert, or_
 from sqlalchemy.exc import IntegrityError
-from datetime import datetime
+from datetime import datetime, date, timedelta
 from decimal import Decimal, InvalidOperation
 
 from database.db import SessionLocal
-from database.models import EstoquePessoal, User
+from database.models import EstoquePessoal, ListaDeCompras, ItemDaLista, User
+from services.data_version import bump_data_version
+from services.stock_movements import record_stock_movement
+from services.prices import latest_prices_by_name, normalize_product_name
 
 inventory_bp = Blueprint('inventory', __name__, url_prefix='/inventory')
 
@@ -57,6 +61,8 @@ def create_inventory_item():
             observacoes=observacoes
         )
         db.add(new_item)
+        record_stock_movement(db, new_item)
+        bump_data_version(db, current_user_id)
         db.commit()
         db.refresh(new_item)
         return jsonify(new_item.to_dict()), 201
@@ -111,6 +117,7 @@ def update_inventory_item(item_id):
         item = db.query(EstoquePessoal).filter_by(id=item_id, usuario_id=current_user_id).first()
         if not item:
             return jsonify({"message": "Item de estoque não encontrado ou não pertence ao usuário."}), 404
+        quantidade_anterior = item.quantidade
 
         nome = data.get('nome')
         categoria = data.get('categoria')
@@ -162,6 +169,8 @@ def update_inventory_item(item_id):
         elif observacoes is None: # Se enviado como None, limpa
             item.observacoes = None
 
+        record_stock_movement(db, item, quantidade_anterior)
+        bump_data_version(db, current_user_id)
         db.commit()
         db.refresh(item)
         return jsonify(item.to_dict()), 200
@@ -186,6 +195,7 @@ def delete_inventory_item(item_id):
             return jsonify({"message": "Item de estoque não encontrado ou não pertence ao usuário."}), 404
 
         db.delete(item)
+        bump_data_version(db, current_user_id)
         db.commit()
         return jsonify({"message": "Item de estoque excluído com sucesso."}), 204
     except Exception as e:
@@ -194,3 +204,122 @@ def delete_inventory_item(item_id):
         return jsonify({"message": "Ocorreu um erro interno ao excluir o item de estoque."}), 500
     finally:
         db.close()
+
+@inventory_bp.route('/replenish', methods=['POST'])
+@jwt_required()
+def replenish_inventory():
+    # Gera uma lista de compras com os itens não comprados cuja quantidade está no limite
+    # ou abaixo dele, ou cuja data necessária vence nos próximos `dias`.
+    current_user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+
+    try:
+        limite = int(data.get('limite', 1))
+        dias = int(data.get('dias', 7))
+        quantidade_alvo = int(data['quantidade_alvo']) if data.get('quantidade_alvo') is not None else limite
+    except (TypeError, ValueError):
+        return jsonify({"message": "'limite', 'dias' e 'quantidade_alvo' devem ser inteiros."}), 400
+    if limite < 0 or dias < 0:
+        return jsonify({"message": "'limite' e 'dias' não podem ser negativos."}), 400
+
+    hoje = date.today()
+    nome_lista = data.get('nome') or f"Reposição {hoje.strftime('%d/%m/%Y')}"
+
+    db = SessionLocal()
+    try:
+        # Condições casam com os índices parciais (usuario_id, quantidade) e (usuario_id, data_necessaria)
+        itens_estoque = db.query(
+            EstoquePessoal.nome,
+            EstoquePessoal.categoria,
+            EstoquePessoal.quantidade,
+            EstoquePessoal.unidade,
+            EstoquePessoal.prioridade,
+            EstoquePessoal.data_necessaria,
+        ).filter(
+            EstoquePessoal.usuario_id == current_user_id,
+            EstoquePessoal.comprado.isnot(True),
+            or_(
+                EstoquePessoal.quantidade <= limite,
+                EstoquePessoal.data_necessaria <= hoje + timedelta(days=dias),
+            )
+        ).order_by(EstoquePessoal.data_necessaria.asc().nulls_last(), EstoquePessoal.nome).all()
+
+        if not itens_estoque:
+            return jsonify({"message": "Nenhum item de estoque precisa de reposição.", "itens_adicionados": 0}), 200
+
+        latest = latest_prices_by_name(db, current_user_id, [item.nome for item in itens_estoque])
+
+        shopping_list = ListaDeCompras(
+            usuario_id=current_user_id,
+            nome=nome_lista,
+            tipo_lista=data.get('tipo_lista', 'reposicao'),
+            observacoes=f"Gerada a partir do estoque (limite {limite}, {dias} dias)."
+        )
+        db.add(shopping_list)
+        db.flush()
+
+        rows = []
+        total = Decimal('0.00')
+        for nome, categoria, quantidade, unidade, prioridade, data_necessaria in itens_estoque:
+            comprar = max(quantidade_alvo - (quantidade or 0), 1)
+            match = latest.get(normalize_product_name(nome))
+            preco = match[1] if match else None
+            total += (preco or Decimal('0.00')) * comprar
+            rows.append({
+                "lista_id": shopping_list.id,
+                "nome": nome,
+                "categoria": categoria,
+                "quantidade": comprar,
+                "unidade": unidade,
+                "prioridade": prioridade,
+                "preco_estimado": preco,
+                "comprado": False,
+                "observacoes": (
+                    f"Estoque atual: {quantidade or 0}"
+                    + (f"; necessário até {data_necessaria.strftime('%d/%m/%Y')}" if data_necessaria else "")
+                ),
+            })
+        # Todos os itens da nova lista em um único INSERT
+        db.execute(insert(ItemDaLista), rows)
+        db.commit()
+        db.refresh(shopping_list)
+
+        return jsonify({
+            "lista": shopping_list.to_dict(),
+            "itens_adicionados": len(rows),
+            "itens_sem_preco": [row["nome"] for row in rows if row["preco_estimado"] is None],
+            "total_estimado": float(total),
+        }), 201
+    except IntegrityError as e:
+        db.rollback()
+        print(f"Erro de integridade ao gerar lista de reposição: {e}")
+        return jsonify({"message": "Erro ao gerar lista de reposição. Verifique os dados fornecidos."}), 400
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao gerar lista de reposição: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao gerar a lista de reposição."}), 500
+    finally:
+        db.close()
+
+@inventory_bp.route('/forecast', methods=['GET'])
+@jwt_required()
+def get_inventory_forecast():
+    # NumPy só é importado na primeira previsão
+    from services.inventory_forecast import forecast_inventory, DEFAULT_HISTORY_DAYS, MAX_HISTORY_DAYS
+
+    current_user_id = get_jwt_identity()
+    try:
+        dias_historico = int(request.args.get('dias_historico', DEFAULT_HISTORY_DAYS))
+    except ValueError:
+        return jsonify({"message": "Parâmetro 'dias_historico' inválido."}), 400
+    if dias_historico < 1 or dias_historico > MAX_HISTORY_DAYS:
+        return jsonify({"message": f"O parâmetro 'dias_historico' deve estar entre 1 e {MAX_HISTORY_DAYS}."}), 400
+
+    db = SessionLocal()
+    try:
+        return jsonify(forecast_inventory(db, current_user_id, dias_historico)), 200
+    except Exception as e:
+        print(f"Erro ao prever consumo do estoque: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao prever o consumo do estoque."}), 500
+    finally:
+        db.close()
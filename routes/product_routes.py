@@ -0,0 +1,374 @@
+# personal_finance_api/routes/product_routes.py
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, date
+from decimal import Decimal, InvalidOperation
+
+from database.db import SessionLocal
+from database.models import Produto, HistoricoPrecoProduto
+from services.data_version import bump_data_version
+from services.prices import latest_prices_query, PRICE_PERIODS
+
+product_bp = Blueprint('products', __name__, url_prefix='/products')
+
+# Limite de registros por requisição na ingestão em lote
+MAX_PRICES_PER_REQUEST = 5000
+
+def _parse_date_range():
+    from_str = request.args.get('from')
+    to_str = request.args.get('to')
+    start = datetime.fromisoformat(from_str).date() if from_str else None
+    end = datetime.fromisoformat(to_str).date() if to_str else None
+    return start, end
+
+def _apply_date_range(query, start, end):
+    if start:
+        query = query.filter(HistoricoPrecoProduto.data_registro >= start)
+    if end:
+        query = query.filter(HistoricoPrecoProduto.data_registro <= end)
+    return query
+
+# --- Rotas para Produto ---
+
+@product_bp.route('', methods=['POST'])
+@jwt_required()
+def create_product():
+    current_user_id = get_jwt_identity()
+    data = request.get_json()
+
+    nome = data.get('nome')
+    if not nome:
+        return jsonify({"message": "O nome do produto é obrigatório."}), 400
+
+    db = SessionLocal()
+    try:
+        new_product = Produto(
+            usuario_id=current_user_id,
+            nome=nome,
+            descricao=data.get('descricao'),
+            unidade_medida=data.get('unidade_medida'),
+            categoria_produto=data.get('categoria_produto')
+        )
+        db.add(new_product)
+        bump_data_version(db, current_user_id)
+        db.commit()
+        db.refresh(new_product)
+        return jsonify(new_product.to_dict()), 201
+    except IntegrityError:
+        db.rollback()
+        return jsonify({"message": "Erro ao criar produto. Verifique os dados fornecidos."}), 400
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao criar produto: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao criar o produto."}), 500
+    finally:
+        db.close()
+
+@product_bp.route('', methods=['GET'])
+@jwt_required()
+def get_products():
+    current_user_id = get_jwt_identity()
+    db = SessionLocal()
+    try:
+        products = db.query(Produto).filter_by(usuario_id=current_user_id).order_by(Produto.nome).all()
+        return jsonify([product.to_dict() for product in products]), 200
+    except Exception as e:
+        print(f"Erro ao buscar produtos: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao buscar os produtos."}), 500
+    finally:
+        db.close()
+
+@product_bp.route('/<int:product_id>', methods=['GET'])
+@jwt_required()
+def get_product(product_id):
+    current_user_id = get_jwt_identity()
+    db = SessionLocal()
+    try:
+        product = db.query(Produto).filter_by(id=product_id, usuario_id=current_user_id).first()
+        if not product:
+            return jsonify({"message": "Produto não encontrado ou não pertence ao usuário."}), 404
+        return jsonify(product.to_dict()), 200
+    except Exception as e:
+        print(f"Erro ao buscar produto: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao buscar o produto."}), 500
+    finally:
+        db.close()
+
+@product_bp.route('/<int:product_id>', methods=['PUT'])
+@jwt_required()
+def update_product(product_id):
+    current_user_id = get_jwt_identity()
+    data = request.get_json()
+    db = SessionLocal()
+    try:
+        product = db.query(Produto).filter_by(id=product_id, usuario_id=current_user_id).first()
+        if not product:
+            return jsonify({"message": "Produto não encontrado ou não pertence ao usuário."}), 404
+
+        if data.get('nome'):
+            product.nome = data['nome']
+        if 'descricao' in data:
+            product.descricao = data['descricao']
+        if 'unidade_medida' in data:
+            product.unidade_medida = data['unidade_medida']
+        if 'categoria_produto' in data:
+            product.categoria_produto = data['categoria_produto']
+
+        bump_data_version(db, current_user_id)
+        db.commit()
+        db.refresh(product)
+        return jsonify(product.to_dict()), 200
+    except IntegrityError:
+        db.rollback()
+        return jsonify({"message": "Erro ao atualizar produto. Verifique os dados fornecidos."}), 400
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao atualizar produto: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao atualizar o produto."}), 500
+    finally:
+        db.close()
+
+@product_bp.route('/<int:product_id>', methods=['DELETE'])
+@jwt_required()
+def delete_product(product_id):
+    current_user_id = get_jwt_identity()
+    db = SessionLocal()
+    try:
+        product = db.query(Produto).filter_by(id=product_id, usuario_id=current_user_id).first()
+        if not product:
+            return jsonify({"message": "Produto não encontrado ou não pertence ao usuário."}), 404
+
+        db.delete(product)
+        bump_data_version(db, current_user_id)
+        db.commit()
+        return jsonify({"message": "Produto excluído com sucesso."}), 204
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao excluir produto: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao excluir o produto."}), 500
+    finally:
+        db.close()
+
+# --- Rotas para HistoricoPrecoProduto ---
+
+@product_bp.route('/prices', methods=['POST'])
+@jwt_required()
+def ingest_prices():
+    current_user_id = get_jwt_identity()
+    data = request.get_json()
+
+    # Aceita uma lista de registros ou {"precos": [...]}
+    registros = data.get('precos') if isinstance(data, dict) else data
+    if not isinstance(registros, list) or not registros:
+        return jsonify({"message": "Envie uma lista de preços não vazia."}), 400
+    if len(registros) > MAX_PRICES_PER_REQUEST:
+        return jsonify({"message": f"No máximo {MAX_PRICES_PER_REQUEST} preços por requisição."}), 400
+
+    rows = []
+    for index, registro in enumerate(registros):
+        try:
+            preco = Decimal(str(registro['preco']))
+            if preco < 0:
+                return jsonify({"message": f"Registro {index}: preço não pode ser negativo."}), 400
+            data_str = registro.get('data_registro')
+            rows.append({
+                "produto_id": int(registro['produto_id']),
+                "preco": preco,
+                "data_registro": datetime.fromisoformat(data_str).date() if data_str else date.today(),
+                "local_compra": registro.get('local_compra'),
+            })
+        except (KeyError, TypeError, ValueError, InvalidOperation):
+            return jsonify({"message": f"Registro {index} inválido: 'produto_id' e 'preco' são obrigatórios."}), 400
+
+    db = SessionLocal()
+    try:
+        # Posse verificada uma única vez para todos os produtos do lote
+        produto_ids = {row["produto_id"] for row in rows}
+        owned = {pid for (pid,) in db.query(Produto.id).filter(
+            Produto.id.in_(produto_ids), Produto.usuario_id == current_user_id
+        ).all()}
+        missing = sorted(produto_ids - owned)
+        if missing:
+            return jsonify({"message": "Produtos não encontrados ou não pertencem ao usuário.", "produto_ids": missing}), 404
+
+        # Um único INSERT multi-linha (executemany) para o lote inteiro
+        db.execute(insert(HistoricoPrecoProduto), rows)
+        bump_data_version(db, current_user_id)
+        db.commit()
+        return jsonify({"message": f"{len(rows)} preços registrados com sucesso.", "inseridos": len(rows)}), 201
+    except IntegrityError:
+        db.rollback()
+        return jsonify({"message": "Erro ao registrar preços. Verifique os dados fornecidos."}), 400
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao registrar preços em lote: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao registrar os preços."}), 500
+    finally:
+        db.close()
+
+@product_bp.route('/prices/latest', methods=['GET'])
+@jwt_required()
+def get_latest_prices():
+    current_user_id = get_jwt_identity()
+    db = SessionLocal()
+    try:
+        rows = latest_prices_query(db, current_user_id).all()
+        return jsonify([
+            {
+                "produto_id": produto_id,
+                "preco": float(preco),
+                "data_registro": data_registro.isoformat(),
+                "local_compra": local_compra,
+            }
+            for produto_id, preco, data_registro, local_compra in rows
+        ]), 200
+    except Exception as e:
+        print(f"Erro ao buscar últimos preços: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao buscar os últimos preços."}), 500
+    finally:
+        db.close()
+
+@product_bp.route('/analytics', methods=['GET'])
+@jwt_required()
+def get_price_analytics():
+    # pandas/NumPy só são carregados quando as análises são pedidas
+    from services.price_analytics import (
+        price_analytics, DEFAULT_ANALYTICS_MONTHS, MAX_ANALYTICS_MONTHS, DEFAULT_ROLLING_WINDOW, MAX_ROLLING_WINDOW
+    )
+
+    current_user_id = get_jwt_identity()
+    try:
+        months = int(request.args.get('months', DEFAULT_ANALYTICS_MONTHS))
+        window = int(request.args.get('window', DEFAULT_ROLLING_WINDOW))
+    except ValueError:
+        return jsonify({"message": "Parâmetros 'months' e 'window' devem ser inteiros."}), 400
+    if months < 2 or months > MAX_ANALYTICS_MONTHS:
+        return jsonify({"message": f"O parâmetro 'months' deve estar entre 2 e {MAX_ANALYTICS_MONTHS}."}), 400
+    if window < 1 or window > MAX_ROLLING_WINDOW:
+        return jsonify({"message": f"O parâmetro 'window' deve estar entre 1 e {MAX_ROLLING_WINDOW}."}), 400
+
+    db = SessionLocal()
+    try:
+        return jsonify(price_analytics(db, current_user_id, months, window)), 200
+    except Exception as e:
+        print(f"Erro ao calcular análise de preços: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao calcular a análise de preços."}), 500
+    finally:
+        db.close()
+
+@product_bp.route('/<int:product_id>/prices', methods=['GET'])
+@jwt_required()
+def get_product_prices(product_id):
+    current_user_id = get_jwt_identity()
+    try:
+        start, end = _parse_date_range()
+    except ValueError:
+        return jsonify({"message": "Formato de data inválido. Use YYYY-MM-DD."}), 400
+
+    db = SessionLocal()
+    try:
+        product = db.query(Produto.id).filter_by(id=product_id, usuario_id=current_user_id).first()
+        if not product:
+            return jsonify({"message": "Produto não encontrado ou não pertence ao usuário."}), 404
+
+        query = db.query(HistoricoPrecoProduto).filter(HistoricoPrecoProduto.produto_id == product_id)
+        query = _apply_date_range(query, start, end)
+        prices = query.order_by(HistoricoPrecoProduto.data_registro.desc(), HistoricoPrecoProduto.id.desc()).all()
+        return jsonify([price.to_dict() for price in prices]), 200
+    except Exception as e:
+        print(f"Erro ao buscar histórico de preços: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao buscar o histórico de preços."}), 500
+    finally:
+        db.close()
+
+@product_bp.route('/<int:product_id>/prices/stats', methods=['GET'])
+@jwt_required()
+def get_product_price_stats(product_id):
+    current_user_id = get_jwt_identity()
+    period = request.args.get('period', 'month')
+    if period not in PRICE_PERIODS:
+        return jsonify({"message": f"Período inválido. Use um de: {', '.join(PRICE_PERIODS)}."}), 400
+    try:
+        start, end = _parse_date_range()
+    except ValueError:
+        return jsonify({"message": "Formato de data inválido. Use YYYY-MM-DD."}), 400
+
+    db = SessionLocal()
+    try:
+        product = db.query(Produto.id).filter_by(id=product_id, usuario_id=current_user_id).first()
+        if not product:
+            return jsonify({"message": "Produto não encontrado ou não pertence ao usuário."}), 404
+
+        # date_trunc é específico do PostgreSQL (assim como to_char em summary_routes)
+        periodo = func.date_trunc(period, HistoricoPrecoProduto.data_registro).label('periodo')
+        query = db.query(
+            periodo,
+            func.min(HistoricoPrecoProduto.preco),
+            func.max(HistoricoPrecoProduto.preco),
+            func.avg(HistoricoPrecoProduto.preco),
+            func.count(HistoricoPrecoProduto.id),
+        ).filter(HistoricoPrecoProduto.produto_id == product_id)
+        query = _apply_date_range(query, start, end)
+        rows = query.group_by(periodo).order_by(periodo).all()
+
+        return jsonify([
+            {
+                "periodo": inicio.date().isoformat() if isinstance(inicio, datetime) else str(inicio),
+                "preco_minimo": float(minimo),
+                "preco_maximo": float(maximo),
+                "preco_medio": round(float(medio), 2),
+                "registros": registros,
+            }
+            for inicio, minimo, maximo, medio, registros in rows
+        ]), 200
+    except Exception as e:
+        print(f"Erro ao calcular estatísticas de preço: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao calcular as estatísticas de preço."}), 500
+    finally:
+        db.close()
+
+@product_bp.route('/<int:product_id>/prices/stores', methods=['GET'])
+@jwt_required()
+def get_product_price_by_store(product_id):
+    current_user_id = get_jwt_identity()
+    try:
+        start, end = _parse_date_range()
+    except ValueError:
+        return jsonify({"message": "Formato de data inválido. Use YYYY-MM-DD."}), 400
+
+    db = SessionLocal()
+    try:
+        product = db.query(Produto.id).filter_by(id=product_id, usuario_id=current_user_id).first()
+        if not product:
+            return jsonify({"message": "Produto não encontrado ou não pertence ao usuário."}), 404
+
+        query = db.query(
+            HistoricoPrecoProduto.local_compra,
+            func.min(HistoricoPrecoProduto.preco),
+            func.max(HistoricoPrecoProduto.preco),
+            func.avg(HistoricoPrecoProduto.preco),
+            func.count(HistoricoPrecoProduto.id),
+            func.max(HistoricoPrecoProduto.data_registro),
+        ).filter(HistoricoPrecoProduto.produto_id == product_id)
+        query = _apply_date_range(query, start, end)
+        rows = query.group_by(HistoricoPrecoProduto.local_compra)\
+                    .order_by(func.avg(HistoricoPrecoProduto.preco).asc()).all()
+
+        return jsonify([
+            {
+                "local_compra": local,
+                "preco_minimo": float(minimo),
+                "preco_maximo": float(maximo),
+                "preco_medio": round(float(medio), 2),
+                "registros": registros,
+                "ultimo_registro": ultimo.isoformat() if ultimo else None,
+            }
+            for local, minimo, maximo, medio, registros, ultimo in rows
+        ]), 200
+    except Exception as e:
+        print(f"Erro ao comparar preços por local: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao comparar os preços por local."}), 500
+    finally:
+        db.close()
@@ -1,13 +1,19 @@
 # personal_finance_api/routes/shopping_list_routes.py
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import update, insert, delete, func, case
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
 
 from database.db import SessionLocal
-from database.models import ListaDeCompras, ItemDaLista, User
+from database.models import (
+    ListaDeCompras, ItemDaLista, User, Conta, Categoria, Transacao, HistoricoPrecoProduto,
+    TipoTransacaoEnum, StatusTransacaoEnum
+)
+from services.data_version import bump_data_version
+from services.prices import latest_prices_by_name, normalize_product_name, resolve_products_by_name
 
 # Importante: O url_prefix deve ser '/shopping-list' para corresponder ao frontend
 shopping_list_bp = Blueprint('lists', __name__, url_prefix='/shopping-list')
@@ -59,15 +65,69 @@ def create_shopping_list():
     finally:
         db.close()
 
+def _list_totals_subquery(db, user_id):
+    # Totais por lista agregados no banco; preços são unitários (multiplicados pela quantidade),
+    # e o gasto considera apenas itens comprados com preço real, como no frontend.
+    # O filtro por usuário fica dentro da subconsulta: o Postgres não o empurra para dentro do GROUP BY.
+    quantidade = func.coalesce(ItemDaLista.quantidade, 0)
+    return db.query(
+        ItemDaLista.lista_id.label('lista_id'),
+        func.sum(func.coalesce(ItemDaLista.preco_estimado, 0) * quantidade).label('total_estimado'),
+        func.sum(case(
+            (ItemDaLista.comprado.is_(True), func.coalesce(ItemDaLista.preco_real, 0) * quantidade),
+            else_=0
+        )).label('total_gasto'),
+        func.count(ItemDaLista.id).label('total_itens'),
+        func.sum(case((ItemDaLista.comprado.is_(True), 1), else_=0)).label('itens_comprados'),
+    ).join(ListaDeCompras, ListaDeCompras.id == ItemDaLista.lista_id)\
+     .filter(ListaDeCompras.usuario_id == user_id)\
+     .group_by(ItemDaLista.lista_id).subquery()
+
+
+def _list_totals_dict(meta_valor, total_estimado, total_gasto, total_itens, itens_comprados):
+    total_estimado = Decimal(total_estimado or 0)
+    total_gasto = Decimal(total_gasto or 0)
+    total_itens = int(total_itens or 0)
+    itens_comprados = int(itens_comprados or 0)
+    return {
+        "total_estimado": float(total_estimado),
+        "total_gasto": float(total_gasto),
+        "total_itens": total_itens,
+        "itens_comprados": itens_comprados,
+        "itens_restantes": total_itens - itens_comprados,
+        "restante_meta": float(meta_valor - total_gasto) if meta_valor is not None else None,
+        "estimado_vs_meta": float(meta_valor - total_estimado) if meta_valor is not None else None,
+    }
+
+
 @shopping_list_bp.route('', methods=['GET'])
 @jwt_required()
 def get_shopping_lists():
     current_user_id = get_jwt_identity()
+    # include_items=false devolve só as listas com seus totais (tela de visão geral)
+    include_items = request.args.get('include_items', 'true').strip().lower() not in ('false', '0', 'no')
     db = SessionLocal()
     try:
-        # Carrega as listas e seus itens relacionados em uma única consulta
-        lists = db.query(ListaDeCompras).options(joinedload(ListaDeCompras.itens)).filter_by(usuario_id=current_user_id).all()
-        return jsonify([lst.to_dict() for lst in lists]), 200
+        totais = _list_totals_subquery(db, current_user_id)
+        query = db.query(
+            ListaDeCompras,
+            totais.c.total_estimado,
+            totais.c.total_gasto,
+            totais.c.total_itens,
+            totais.c.itens_comprados,
+        ).outerjoin(totais, totais.c.lista_id == ListaDeCompras.id)\
+         .filter(ListaDeCompras.usuario_id == current_user_id)\
+         .order_by(ListaDeCompras.id)
+        if include_items:
+            # Listas, itens e totais em uma única consulta
+            query = query.options(joinedload(ListaDeCompras.itens))
+
+        result = []
+        for lst, total_estimado, total_gasto, total_itens, itens_comprados in query.all():
+            data = lst.to_dict(include_related=include_items)
+            data['totais'] = _list_totals_dict(lst.meta_valor, total_estimado, total_gasto, total_itens, itens_comprados)
+            result.append(data)
+        return jsonify(result), 200
     except Exception as e:
         print(f"Erro ao buscar listas de compras: {e}")
         return jsonify({"message": "Ocorreu um erro ao buscar as listas de compras."}), 500
@@ -158,6 +218,200 @@ def delete_shopping_list(list_id):
         db.close()
 
 
+@shopping_list_bp.route('/<int:list_id>/estimate', methods=['POST'])
+@jwt_required()
+def estimate_shopping_list(list_id):
+    current_user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+    # Por padrão só preenche itens sem preço estimado; 'sobrescrever' substitui todos os encontrados
+    sobrescrever = bool(data.get('sobrescrever', False))
+
+    db = SessionLocal()
+    try:
+        shopping_list = db.query(ListaDeCompras.id).filter_by(id=list_id, usuario_id=current_user_id).first()
+        if not shopping_list:
+            return jsonify({"message": "Lista de compras não encontrada ou não pertence ao usuário."}), 404
+
+        items = db.query(ItemDaLista.id, ItemDaLista.nome, ItemDaLista.quantidade, ItemDaLista.preco_estimado)\
+                  .filter(ItemDaLista.lista_id == list_id).order_by(ItemDaLista.id).all()
+        latest = latest_prices_by_name(db, current_user_id, [item.nome for item in items])
+
+        updates = []
+        resultado = []
+        sem_preco = []
+        total = Decimal('0.00')
+        for item_id, nome, quantidade, preco_estimado in items:
+            match = latest.get(normalize_product_name(nome))
+            produto_id = None
+            if match and (sobrescrever or preco_estimado is None):
+                produto_id, preco_estimado, data_preco = match
+                updates.append({"id": item_id, "preco_estimado": preco_estimado})
+            elif not match:
+                sem_preco.append(nome)
+            total += (preco_estimado or Decimal('0.00')) * (quantidade or 0)
+            resultado.append({
+                "id": item_id,
+                "nome": nome,
+                "quantidade": quantidade,
+                "preco_estimado": float(preco_estimado) if preco_estimado is not None else None,
+                "produto_id": produto_id,
+                "data_preco": data_preco.isoformat() if produto_id else None,
+            })
+
+        if updates:
+            # UPDATE em lote por chave primária (executemany) em vez de um UPDATE por item
+            db.execute(update(ItemDaLista), updates)
+            db.commit()
+
+        return jsonify({
+            "lista_id": list_id,
+            "itens_atualizados": len(updates),
+            "itens_sem_preco": sem_preco,
+            "total_estimado": float(total),
+            "itens": resultado,
+        }), 200
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao estimar preços da lista de compras: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao estimar os preços da lista de compras."}), 500
+    finally:
+        db.close()
+
+
+CHECKOUT_GROUPINGS = ('categoria', 'total')
+SEM_CATEGORIA = 'Sem categoria'
+
+@shopping_list_bp.route('/<int:list_id>/checkout', methods=['POST'])
+@jwt_required()
+def checkout_shopping_list(list_id):
+    # Converte os itens comprados (com preço real) em despesas pagas na conta informada,
+    # registra o histórico de preços e finaliza a lista, tudo em um único commit.
+    current_user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+
+    conta_id = data.get('conta_id')
+    agrupar = data.get('agrupar', 'categoria')
+    registrar_precos = bool(data.get('registrar_precos', True))
+    local_compra = data.get('local_compra')
+
+    if not conta_id:
+        return jsonify({"message": "A conta é obrigatória para finalizar a compra."}), 400
+    if agrupar not in CHECKOUT_GROUPINGS:
+        return jsonify({"message": f"Agrupamento inválido. Use um de: {', '.join(CHECKOUT_GROUPINGS)}."}), 400
+    try:
+        data_compra = datetime.fromisoformat(data['data'].replace('Z', '+00:00')) if data.get('data') else datetime.now()
+    except (AttributeError, ValueError):
+        return jsonify({"message": "Formato de data inválido."}), 400
+
+    db = SessionLocal()
+    try:
+        # Bloqueia a lista para que dois checkouts simultâneos não gerem lançamentos em dobro
+        shopping_list = db.query(ListaDeCompras).filter_by(id=list_id, usuario_id=current_user_id)\
+                          .with_for_update().first()
+        if not shopping_list:
+            return jsonify({"message": "Lista de compras não encontrada ou não pertence ao usuário."}), 404
+        if shopping_list.ativa is False:
+            return jsonify({"message": "Esta lista de compras já foi finalizada."}), 409
+
+        conta = db.query(Conta.id).filter_by(id=conta_id, user_id=current_user_id).first()
+        if not conta:
+            return jsonify({"message": "Conta não encontrada ou não pertence ao usuário."}), 404
+
+        items = db.query(ItemDaLista).filter(
+            ItemDaLista.lista_id == list_id, ItemDaLista.comprado.is_(True)
+        ).order_by(ItemDaLista.id).all()
+        priced = [item for item in items if item.preco_real is not None]
+        sem_preco = [item.nome for item in items if item.preco_real is None]
+        if not priced:
+            return jsonify({"message": "Nenhum item comprado com preço real para finalizar."}), 400
+
+        grupos = {}
+        for item in priced:
+            chave = ((item.categoria or '').strip() or SEM_CATEGORIA) if agrupar == 'categoria' else None
+            grupos[chave] = grupos.get(chave, Decimal('0.00')) + item.preco_real * (item.quantidade or 0)
+
+        # Categorias do usuário com o mesmo nome das categorias dos itens (de despesa primeiro), em uma consulta
+        categoria_ids = {}
+        if agrupar == 'categoria':
+            nomes = {normalize_product_name(nome) for nome in grupos}
+            for nome, categoria_id in db.query(func.lower(func.trim(Categoria.nome)), Categoria.id).filter(
+                Categoria.user_id == current_user_id, func.lower(func.trim(Categoria.nome)).in_(nomes)
+            ).order_by(case((Categoria.tipo == 'expense', 0), else_=1), Categoria.id).all():
+                categoria_ids.setdefault(nome, categoria_id)
+
+        chaves = list(grupos)
+        transacoes = [
+            {
+                "valor": grupos[chave],
+                "descricao": f"Compras: {shopping_list.nome}" + (f" - {chave}" if chave else ""),
+                "data": data_compra,
+                "tipo": TipoTransacaoEnum.DESPESA,
+                "status": StatusTransacaoEnum.PAGO,
+                "data_pagamento_recebimento": data_compra.date(),
+                "user_id": int(current_user_id),
+                "conta_id": conta.id,
+                "categoria_id": categoria_ids.get(normalize_product_name(chave)) if chave else None,
+                "observacoes": f"Gerada a partir da lista de compras #{list_id}.",
+                "entidade": local_compra,
+                "parcelado": False,
+            }
+            for chave in chaves
+        ]
+        transacao_ids = db.execute(
+            insert(Transacao).returning(Transacao.id, sort_by_parameter_order=True), transacoes
+        ).scalars().all()
+        total = sum(grupos.values(), Decimal('0.00'))
+
+        precos_registrados = 0
+        produtos_criados = 0
+        if registrar_precos:
+            produtos, produtos_criados = resolve_products_by_name(
+                db, current_user_id, [(item.nome, item.unidade, item.categoria) for item in priced]
+            )
+            historico = [
+                {
+                    "produto_id": produtos[normalize_product_name(item.nome)],
+                    "preco": item.preco_real,
+                    "data_registro": (item.data_compra or data_compra).date(),
+                    "local_compra": local_compra,
+                }
+                for item in priced if normalize_product_name(item.nome) in produtos
+            ]
+            if historico:
+                db.execute(insert(HistoricoPrecoProduto), historico)
+            precos_registrados = len(historico)
+
+        # Saldo atualizado no próprio banco, como nas contribuições de metas
+        db.query(Conta).filter(Conta.id == conta.id).update(
+            {Conta.saldo_atual: Conta.saldo_atual - total}, synchronize_session=False
+        )
+        shopping_list.ativa = False
+        bump_data_version(db, current_user_id)
+        db.commit()
+
+        return jsonify({
+            "lista_id": list_id,
+            "conta_id": conta.id,
+            "total": float(total),
+            "transacoes": [
+                {"id": transacao_id, "categoria": chave, "valor": float(grupos[chave])}
+                for transacao_id, chave in zip(transacao_ids, chaves)
+            ],
+            "precos_registrados": precos_registrados,
+            "produtos_criados": produtos_criados,
+            "itens_sem_preco": sem_preco,
+        }), 201
+    except IntegrityError:
+        db.rollback()
+        return jsonify({"message": "Erro ao finalizar a lista de compras. Verifique os dados fornecidos."}), 400
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao finalizar lista de compras: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao finalizar a lista de compras."}), 500
+    finally:
+        db.close()
+
+
 # --- Rotas para ItensDaLista ---
 
 @shopping_list_bp.route('/<int:list_id>/items', methods=['POST'])
@@ -267,6 +521,146 @@ def get_shopping_list_items(list_id):
         db.close()
 
 
+class _BatchError(ValueError):
+    pass
+
+
+def _batch_money(value, campo, index):
+    if value is None:
+        return None
+    try:
+        valor = Decimal(str(value))
+    except InvalidOperation:
+        raise _BatchError(f"{campo} inválido no item {index}.")
+    if valor < 0:
+        raise _BatchError(f"{campo} não pode ser negativo (item {index}).")
+    return valor
+
+
+def _batch_datetime(value, index):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        raise _BatchError(f"Formato de data de compra inválido no item {index}.")
+
+
+def _batch_id(value, operacao, index):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise _BatchError(f"'{operacao}': id inválido na posição {index}.")
+
+
+@shopping_list_bp.route('/<int:list_id>/items/batch', methods=['POST'])
+@jwt_required()
+def batch_shopping_list_items(list_id):
+    # Corpo: {"comprar": [{"id", "preco_real"?, "data_compra"?}], "adicionar": [{...item}], "excluir": [ids]}
+    # "data_compra" no nível superior vale para os itens de "comprar" que não informarem a sua.
+    current_user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+    comprar = data.get('comprar') or []
+    adicionar = data.get('adicionar') or []
+    excluir = data.get('excluir') or []
+
+    if not isinstance(comprar, list) or not isinstance(adicionar, list) or not isinstance(excluir, list):
+        return jsonify({"message": "'comprar', 'adicionar' e 'excluir' devem ser listas."}), 400
+    if not (comprar or adicionar or excluir):
+        return jsonify({"message": "Nenhuma operação informada."}), 400
+
+    # Validação completa antes de tocar no banco: o lote é aplicado inteiro ou não é aplicado
+    try:
+        data_compra_padrao = _batch_datetime(data.get('data_compra'), 'lote')
+        compras = []
+        for index, entrada in enumerate(comprar):
+            if not isinstance(entrada, dict):
+                entrada = {"id": entrada}
+            compra = {"id": _batch_id(entrada.get('id'), 'comprar', index), "comprado": True}
+            if 'preco_real' in entrada:
+                compra["preco_real"] = _batch_money(entrada['preco_real'], "Preço real", index)
+            data_compra = _batch_datetime(entrada.get('data_compra'), index) or data_compra_padrao
+            if data_compra:
+                compra["data_compra"] = data_compra
+            compras.append(compra)
+
+        novos = []
+        for index, entrada in enumerate(adicionar):
+            if not isinstance(entrada, dict):
+                raise _BatchError(f"'adicionar': item {index} deve ser um objeto.")
+            quantidade = entrada.get('quantidade')
+            if not entrada.get('nome') or quantidade is None:
+                raise _BatchError(f"Nome e quantidade são obrigatórios (item {index}).")
+            if not isinstance(quantidade, (int, float)) or quantidade <= 0:
+                raise _BatchError(f"Quantidade deve ser um número positivo (item {index}).")
+            novos.append({
+                "lista_id": list_id,
+                "nome": entrada['nome'],
+                "quantidade": quantidade,
+                "unidade": entrada.get('unidade'),
+                "prioridade": entrada.get('prioridade'),
+                "preco_estimado": _batch_money(entrada.get('preco_estimado'), "Preço estimado", index),
+                "comprado": bool(entrada.get('comprado', False)),
+                "observacoes": entrada.get('observacoes'),
+                "categoria": entrada.get('categoria'),
+                "preco_real": _batch_money(entrada.get('preco_real'), "Preço real", index),
+                "data_compra": _batch_datetime(entrada.get('data_compra'), index),
+            })
+
+        excluidos = {_batch_id(item_id, 'excluir', index) for index, item_id in enumerate(excluir)}
+    except _BatchError as e:
+        return jsonify({"message": str(e)}), 400
+
+    compra_ids = {compra["id"] for compra in compras}
+    if compra_ids & excluidos:
+        return jsonify({"message": "Um mesmo item não pode ser comprado e excluído no mesmo lote."}), 400
+
+    db = SessionLocal()
+    try:
+        # Posse verificada uma única vez: a lista é do usuário e todos os ids pertencem a ela
+        shopping_list = db.query(ListaDeCompras.id).filter_by(id=list_id, usuario_id=current_user_id).first()
+        if not shopping_list:
+            return jsonify({"message": "Lista de compras não encontrada ou não pertence ao usuário."}), 404
+
+        referenciados = compra_ids | excluidos
+        if referenciados:
+            encontrados = {item_id for (item_id,) in db.query(ItemDaLista.id).filter(
+                ItemDaLista.lista_id == list_id, ItemDaLista.id.in_(referenciados)
+            ).all()}
+            faltando = sorted(referenciados - encontrados)
+            if faltando:
+                return jsonify({"message": "Itens não encontrados nesta lista.", "item_ids": faltando}), 404
+
+        # Uma instrução por tipo de operação e um único commit
+        if compras:
+            db.execute(update(ItemDaLista), compras)
+        if novos:
+            db.execute(insert(ItemDaLista), novos)
+        if excluidos:
+            db.execute(
+                delete(ItemDaLista).where(ItemDaLista.lista_id == list_id, ItemDaLista.id.in_(excluidos)),
+                execution_options={"synchronize_session": False}
+            )
+        db.commit()
+
+        items = db.query(ItemDaLista).filter_by(lista_id=list_id).order_by(ItemDaLista.id).all()
+        return jsonify({
+            "comprados": len(compras),
+            "adicionados": len(novos),
+            "excluidos": len(excluidos),
+            "itens": [item.to_dict() for item in items],
+        }), 200
+    except IntegrityError:
+        db.rollback()
+        return jsonify({"message": "Erro ao aplicar operações em lote. Verifique os dados fornecidos."}), 400
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao aplicar operações em lote na lista de compras: {e}")
+        return jsonify({"message": "Ocorreu um erro interno ao aplicar as operações em lote."}), 500
+    finally:
+        db.close()
+
+
 @shopping_list_bp.route('/items/<int:item_id>', methods=['PUT'])
 @jwt_required()
 def update_shopping_list_item(item_id):
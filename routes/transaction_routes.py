@@ -8,7 +8,8 @@ import io
 
 from database.db import SessionLocal
 from database.models import Transacao, Conta, Categoria, User
-import pandas as pd
+from services.data_version import bump_data_version
+from services.columnar import COLUMNAR_FORMATS, TRANSACTION_COLUMNS, requested_format, invalid_format_response, columnar_response
 
 transaction_bp = Blueprint('transactions', __name__, url_prefix='/transactions')
 
@@ -104,6 +105,7 @@ def create_transaction():
         else: # Assumindo que o outro tipo é 'DESPESA'
             conta.saldo_atual -= valor
 
+        bump_data_version(db, current_user_id)
         db.commit()
         db.refresh(new_transaction)
         db.refresh(conta)
@@ -122,8 +124,16 @@ def create_transaction():
 @jwt_required()
 def get_transactions():
     current_user_id = get_jwt_identity()
+    fmt = requested_format()
+    if fmt is not None and fmt not in COLUMNAR_FORMATS:
+        return invalid_format_response(fmt)
+
     db = SessionLocal()
     try:
+        if fmt is not None:
+            rows = db.query(*TRANSACTION_COLUMNS).filter(Transacao.user_id == current_user_id).all()
+            return columnar_response(TRANSACTION_COLUMNS, rows, fmt)
+
         transactions = db.query(Transacao).filter_by(user_id=current_user_id).all()
         # O to_dict() já faz o mapeamento para o frontend (income/expense)
         return jsonify([t.to_dict() for t in transactions]), 200
@@ -250,6 +260,7 @@ def update_transaction(transaction_id):
                 current_conta.saldo_atual -= transaction.valor
             db.add(current_conta)
 
+        bump_data_version(db, current_user_id)
         db.commit()
         db.refresh(transaction)
         if old_conta_id != transaction.conta_id and old_conta:
@@ -287,6 +298,7 @@ def delete_transaction(transaction_id):
             db.add(conta)
 
         db.delete(transaction)
+        bump_data_version(db, current_user_id)
         db.commit()
         if conta:
             db.refresh(conta)
@@ -303,6 +315,8 @@ def delete_transaction(transaction_id):
 @transaction_bp.route('/import', methods=['POST'])
 @jwt_required()
 def import_transactions():
+    import pandas as pd  # carregado só aqui e na exportação, não na inicialização do worker
+
     current_user_id = get_jwt_identity()
     
     if 'file' not in request.files:
@@ -414,6 +428,7 @@ def import_transactions():
             except Exception as e:
                 errors.append(f"Linha {index + 2}: Erro inesperado: {e}. Dados: {row.to_dict()}")
 
+        bump_data_version(db, current_user_id)
         db.commit()
         
         for acc_id in set(user_accounts.values()):
@@ -439,6 +454,8 @@ def import_transactions():
 @transaction_bp.route('/export', methods=['GET'])
 @jwt_required()
 def export_transactions():
+    import pandas as pd
+
     current_user_id = get_jwt_identity()
     db = SessionLocal()
     try:
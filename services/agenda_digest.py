@@ -0,0 +1,135 @@
+# personal_finance_api/services/agenda_digest.py
+import argparse
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, case, literal
+
+from database.db import SessionLocal
+from database.models import Transacao, Conta, User, StatusTransacaoEnum, TipoTransacaoEnum
+
+DIGEST_BUCKETS = ('vencidas', 'hoje', 'semana')
+UPCOMING_DAYS = 7
+
+
+def _empty_bucket():
+    return {"quantidade": 0, "receitas": Decimal('0.00'), "despesas": Decimal('0.00')}
+
+
+def _digest_rows(db, user_ids, today):
+    # Uma única consulta agrupada sobre o índice parcial de pendentes (user_id, data_vencimento)
+    bucket = case(
+        (Transacao.data_vencimento < today, literal('vencidas')),
+        (Transacao.data_vencimento == today, literal('hoje')),
+        else_=literal('semana')
+    ).label('bucket')
+
+    return db.query(
+        Transacao.user_id,
+        Transacao.conta_id,
+        Conta.nome,
+        bucket,
+        Transacao.tipo,
+        func.count(Transacao.id),
+        func.sum(Transacao.valor),
+    ).join(Conta, Conta.id == Transacao.conta_id)\
+     .filter(
+         Transacao.user_id.in_(user_ids),
+         Transacao.status == StatusTransacaoEnum.PENDENTE,
+         Transacao.data_vencimento <= today + timedelta(days=UPCOMING_DAYS)
+     ).group_by(Transacao.user_id, Transacao.conta_id, Conta.nome, bucket, Transacao.tipo).all()
+
+
+def _build_digests(rows, today):
+    digests = {}
+    for user_id, conta_id, conta_nome, bucket, tipo, quantidade, total in rows:
+        contas = digests.setdefault(user_id, {})
+        conta = contas.setdefault(conta_id, {
+            "conta_id": conta_id,
+            "nome_conta": conta_nome,
+            **{name: _empty_bucket() for name in DIGEST_BUCKETS},
+        })
+        destino = conta[bucket]
+        destino["quantidade"] += quantidade
+        if tipo == TipoTransacaoEnum.RECEITA:
+            destino["receitas"] += total or Decimal('0.00')
+        else:
+            destino["despesas"] += total or Decimal('0.00')
+
+    return {user_id: _serialize(list(contas.values()), today) for user_id, contas in digests.items()}
+
+
+def _serialize(contas, today):
+    totais = {name: _empty_bucket() for name in DIGEST_BUCKETS}
+    for conta in contas:
+        for name in DIGEST_BUCKETS:
+            for campo in ("quantidade", "receitas", "despesas"):
+                totais[name][campo] += conta[name][campo]
+
+    def as_json(bucket):
+        return {
+            "quantidade": bucket["quantidade"],
+            "receitas": float(bucket["receitas"]),
+            "despesas": float(bucket["despesas"]),
+        }
+
+    return {
+        "data_referencia": today.isoformat(),
+        "dias_a_vencer": UPCOMING_DAYS,
+        "contas": [
+            {
+                "conta_id": conta["conta_id"],
+                "nome_conta": conta["nome_conta"],
+                **{name: as_json(conta[name]) for name in DIGEST_BUCKETS},
+            }
+            for conta in sorted(contas, key=lambda c: c["conta_id"])
+        ],
+        "totais": {name: as_json(totais[name]) for name in DIGEST_BUCKETS},
+    }
+
+
+def compute_digest(db, user_id, today=None):
+    today = today or date.today()
+    digests = _build_digests(_digest_rows(db, [int(user_id)], today), today)
+    return digests.get(int(user_id), _serialize([], today))
+
+
+def iter_all_digests(db, chunk_size=500, today=None):
+    # Modo lote: percorre os usuários por chave (id > último id) em blocos,
+    # com uma consulta agrupada por bloco. Só usuários com pendências são retornados.
+    today = today or date.today()
+    last_id = 0
+    while True:
+        user_ids = [row[0] for row in db.query(User.id)
+                                        .filter(User.id > last_id)
+                                        .order_by(User.id)
+                                        .limit(chunk_size).all()]
+        if not user_ids:
+            return
+        digests = _build_digests(_digest_rows(db, user_ids, today), today)
+        for user_id in user_ids:
+            if user_id in digests:
+                yield user_id, digests[user_id]
+        last_id = user_ids[-1]
+        db.expunge_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calcula o resumo de vencimentos da agenda para todos os usuários.")
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--date', help="Data de referência (YYYY-MM-DD); padrão: hoje")
+    args = parser.parse_args()
+
+    today = date.fromisoformat(args.date) if args.date else date.today()
+    db = SessionLocal()
+    try:
+        # Uma linha JSON por usuário, para consumo pelo agendador de notificações
+        for user_id, digest in iter_all_digests(db, chunk_size=args.chunk_size, today=today):
+            print(json.dumps({"user_id": user_id, **digest}, ensure_ascii=False))
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
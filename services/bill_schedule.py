@@ -0,0 +1,55 @@
+# personal_finance_api/services/bill_schedule.py
+import calendar
+import heapq
+from datetime import date
+
+
+def add_months(d, months):
+    # Mantém o dia do mês, limitado ao último dia do mês de destino (31/01 + 1 mês = 28/02)
+    month_index = d.month - 1 + months
+    year = d.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(d.day, calendar.monthrange(year, month)[1])
+    return date(year, month, day)
+
+
+def months_between(start, end):
+    return (end.year - start.year) * 12 + (end.month - start.month)
+
+
+def iter_bill_occurrences(bill, start, end):
+    # Gera (numero_parcela, data, valor) das ocorrências mensais de uma ContaAPagar dentro de [start, end].
+    # Contas recorrentes sem data_fim são séries infinitas: só o intervalo pedido é percorrido.
+    if bill.data_inicio is None or end < start:
+        return
+    valor = bill.valor_parcela if bill.valor_parcela is not None else bill.valor_total
+    if valor is None:
+        return
+
+    if bill.recorrente:
+        total = None
+    else:
+        total = bill.numero_parcelas or 1
+
+    # Pula direto para a primeira parcela que pode cair no intervalo
+    k = max(0, months_between(bill.data_inicio, start) - 1)
+    while total is None or k < total:
+        occurrence = add_months(bill.data_inicio, k)
+        if occurrence > end or (bill.data_fim is not None and occurrence > bill.data_fim):
+            return
+        if occurrence >= start:
+            yield k + 1, occurrence, valor
+        k += 1
+
+
+def _keyed_occurrences(bill, start, end):
+    for numero_parcela, occurrence, valor in iter_bill_occurrences(bill, start, end):
+        yield occurrence, bill.id, numero_parcela, bill, valor
+
+
+def iter_occurrences_for_bills(bills, start, end):
+    # Intercala as séries de todas as contas em ordem de data, sem materializá-las:
+    # heapq.merge mantém apenas a próxima ocorrência de cada conta em memória.
+    streams = [_keyed_occurrences(bill, start, end) for bill in bills]
+    for occurrence, _, numero_parcela, bill, valor in heapq.merge(*streams, key=lambda item: item[:2]):
+        yield bill, numero_parcela, occurrence, valor
@@ -0,0 +1,71 @@
+# personal_finance_api/services/columnar.py
+#
+# Formato colunar opcional para listagens grandes: {"columns": [...], "rows": [[...], ...]}.
+# Os nomes das chaves aparecem uma vez só e as linhas saem direto das tuplas da consulta,
+# sem instanciar objetos ORM nem montar um dict por linha.
+#
+#   GET /transactions?format=columnar             -> JSON colunar
+#   GET /transactions?format=msgpack              -> MessagePack (mesma estrutura)
+#   GET /transactions  Accept: application/msgpack
+from flask import current_app, request, jsonify
+
+from database.models import Transacao
+from services.json_provider import encode_default
+
+COLUMNAR_FORMATS = ('columnar', 'msgpack')
+MSGPACK_MIMETYPE = 'application/msgpack'
+_MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, 'application/x-msgpack')
+
+# Mesmos campos de primeiro nível de Transacao.to_dict
+TRANSACTION_COLUMNS = (
+    Transacao.id,
+    Transacao.descricao,
+    Transacao.valor,
+    Transacao.tipo,
+    Transacao.data,
+    Transacao.conta_id,
+    Transacao.categoria_id,
+    Transacao.user_id,
+    Transacao.observacoes,
+    Transacao.created_at,
+    Transacao.updated_at,
+    Transacao.data_vencimento,
+    Transacao.entidade,
+    Transacao.status,
+    Transacao.data_pagamento_recebimento,
+    Transacao.parcelado,
+    Transacao.numero_parcela,
+    Transacao.total_parcelas,
+    Transacao.id_transacao_pai,
+)
+
+
+def requested_format():
+    # None mantém a lista de objetos de sempre
+    fmt = request.args.get('format')
+    if fmt:
+        return fmt.strip().lower()
+    accept = request.accept_mimetypes
+    msgpack_quality = max(accept.quality(mimetype) for mimetype in _MSGPACK_MIMETYPES)
+    if msgpack_quality > accept.quality('application/json'):
+        return 'msgpack'
+    return None
+
+
+def invalid_format_response(fmt):
+    return jsonify({"message": f"Formato '{fmt}' inválido. Use um de: {', '.join(COLUMNAR_FORMATS)}."}), 400
+
+
+def columnar_response(columns, rows, fmt):
+    payload = {
+        "columns": [column.key for column in columns],
+        "rows": [tuple(row) for row in rows],
+    }
+    if fmt == 'msgpack':
+        try:
+            import msgpack  # dependência opcional
+        except ImportError:
+            return jsonify({"message": "Formato MessagePack indisponível neste servidor."}), 406
+        body = msgpack.packb(payload, default=encode_default, use_bin_type=True)
+        return current_app.response_class(body, mimetype=MSGPACK_MIMETYPE), 200
+    return jsonify(payload), 200
@@ -0,0 +1,17 @@
+# personal_finance_api/services/data_version.py
+from database.models import User
+
+
+def get_data_version(db, user_id):
+    # Leitura de uma única coluna pela chave primária: custo desprezível por requisição
+    version = db.query(User.data_version).filter(User.id == int(user_id)).scalar()
+    return version or 0
+
+
+def bump_data_version(db, user_id):
+    # Deve ser chamado dentro da mesma transação da escrita, antes do commit,
+    # para que todos os workers enxerguem a nova versão junto com os novos dados.
+    db.query(User).filter(User.id == int(user_id)).update(
+        {User.data_version: User.data_version + 1},
+        synchronize_session=False
+    )
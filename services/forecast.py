@@ -0,0 +1,98 @@
+# personal_finance_api/services/forecast.py
+from datetime import date, timedelta
+
+import numpy as np
+
+from database.models import Conta, ContaAPagar
+from services.bill_schedule import add_months, iter_occurrences_for_bills
+from services.data_version import get_data_version
+from services.result_cache import ResultCache
+from services.transaction_cache import get_user_transactions
+
+MAX_FORECAST_MONTHS = 24
+
+_forecast_cache = ResultCache(max_entries=512)
+
+
+def _first_negative(dates, balances):
+    # Índice do primeiro dia com saldo negativo em cada linha (ou None)
+    negative = balances < 0
+    has_negative = negative.any(axis=1)
+    first = negative.argmax(axis=1)
+    return [dates[i].isoformat() if flag else None for i, flag in zip(first, has_negative)]
+
+
+def _compute_forecast(db, user_id, months, today):
+    end = add_months(today, months)
+    days = (end - today).days + 1
+    dates = [today + timedelta(days=i) for i in range(days)]
+
+    contas = db.query(Conta.id, Conta.nome, Conta.saldo_atual)\
+               .filter(Conta.user_id == int(user_id))\
+               .order_by(Conta.id).all()
+    conta_ids = np.array([c.id for c in contas], dtype=np.int32)
+
+    # Linhas 0..n-1: contas do usuário; linha n: contas a pagar (não vinculadas a uma conta)
+    bills_row = len(contas)
+    initial = np.zeros(bills_row + 1, dtype=np.int64)
+    initial[:bills_row] = [int(c.saldo_atual * 100) for c in contas]
+    deltas = np.zeros((bills_row + 1, days), dtype=np.int64)
+
+    # Itens pendentes da agenda até o fim do horizonte; os já vencidos entram no dia de hoje
+    pending = get_user_transactions(db, user_id).filter(status='PENDENTE', due_end=end)
+    if len(pending) and len(conta_ids):
+        rows = np.minimum(np.searchsorted(conta_ids, pending.conta_ids), len(conta_ids) - 1)
+        known = conta_ids[rows] == pending.conta_ids
+        cols = np.clip(pending.due_dates.astype(np.int64) - today.toordinal(), 0, days - 1)
+        np.add.at(deltas, (rows[known], cols[known]), pending.cents[known])
+
+    bills = db.query(ContaAPagar).filter(ContaAPagar.usuario_id == int(user_id)).all()
+    bill_days = []
+    bill_cents = []
+    for _, _, occurrence, valor in iter_occurrences_for_bills(bills, today, end):
+        bill_days.append((occurrence - today).days)
+        bill_cents.append(-int(valor * 100))
+    if bill_days:
+        np.add.at(deltas[bills_row], np.array(bill_days, dtype=np.int64), np.array(bill_cents, dtype=np.int64))
+
+    balances = initial[:, None] + np.cumsum(deltas, axis=1)
+    total = balances.sum(axis=0, keepdims=True)
+    first_negative = _first_negative(dates, balances)
+    total_first_negative = _first_negative(dates, total)[0]
+
+    def as_money(row):
+        return (row / 100.0).round(2).tolist()
+
+    result = {
+        "data_inicial": today.isoformat(),
+        "data_final": end.isoformat(),
+        "meses": months,
+        "datas": [d.isoformat() for d in dates],
+        "contas": [
+            {
+                "conta_id": conta.id,
+                "nome": conta.nome,
+                "saldo_atual": float(conta.saldo_atual),
+                "saldos": as_money(balances[i]),
+                "saldo_minimo": float(balances[i].min()) / 100.0,
+                "primeira_data_negativa": first_negative[i],
+            }
+            for i, conta in enumerate(contas)
+        ],
+        "contas_a_pagar": {
+            "saldos": as_money(balances[bills_row]),
+            "total_previsto": float(-deltas[bills_row].sum()) / 100.0,
+        },
+        "total": {
+            "saldos": as_money(total[0]),
+            "saldo_minimo": float(total[0].min()) / 100.0,
+            "primeira_data_negativa": total_first_negative,
+        },
+    }
+    return result
+
+
+def project_cash_flow(db, user_id, months, today=None):
+    today = today or date.today()
+    key = (int(user_id), get_data_version(db, user_id), months, today)
+    return _forecast_cache.get_or_compute(key, lambda: _compute_forecast(db, user_id, months, today))
@@ -0,0 +1,113 @@
+# personal_finance_api/services/goal_simulation.py
+from datetime import date, timedelta
+
+import numpy as np
+
+from services.bill_schedule import add_months, months_between
+from services.data_version import get_data_version
+from services.result_cache import ResultCache
+from services.transaction_cache import get_user_transactions, ordinals_to_datetime64
+
+HISTORY_MONTHS = 24
+MIN_HISTORY_MONTHS = 3
+MAX_PATHS = 50000
+# Horizonte máximo: a matriz simulada tem caminhos x meses (50000 x 120 ~ 48 MB por cópia)
+MAX_SIMULATION_MONTHS = 120
+
+_simulation_cache = ResultCache(max_entries=512)
+
+
+class InsufficientHistoryError(Exception):
+    pass
+
+
+class SimulationHorizonError(Exception):
+    pass
+
+
+def monthly_net_history(columns, today, months=HISTORY_MONTHS):
+    # Fluxo líquido (centavos) de cada mês completo, do primeiro mês com movimento até o mês anterior a hoje.
+    # Meses sem transações entram como zero: também fazem parte da distribuição.
+    current_month_start = today.replace(day=1)
+    recent = columns.filter(
+        start=add_months(current_month_start, -months),
+        end=current_month_start - timedelta(days=1),
+        status=('PENDENTE', 'PAGO', 'RECEBIDO')
+    )
+    if not len(recent):
+        return np.zeros(0, dtype=np.int64)
+
+    month_index = ordinals_to_datetime64(recent.dates).astype('datetime64[M]').astype(np.int64)
+    current_month = np.datetime64(current_month_start, 'M').astype(np.int64)
+    offsets = month_index - month_index.min()
+    totals = np.zeros(current_month - month_index.min(), dtype=np.int64)
+    np.add.at(totals, offsets, recent.cents)
+    return totals
+
+
+def _run_simulation(history, reservado_cents, necessario_cents, months_left, n_paths, fracao, seed):
+    rng = np.random.default_rng(seed)
+    # Bootstrap: cada caminho sorteia, com reposição, um mês histórico para cada mês futuro
+    samples = rng.choice(history, size=(n_paths, months_left)) * fracao
+    paths = reservado_cents + np.cumsum(samples, axis=1)
+    reached = paths >= necessario_cents
+    reached_any = reached.any(axis=1)
+    first_month = np.where(reached_any, reached.argmax(axis=1) + 1, -1)
+    final = paths[:, -1]
+    return reached_any, first_month, final
+
+
+def simulate_goal(db, user_id, goal, n_paths=5000, fracao=1.0, today=None):
+    today = today or date.today()
+    version = get_data_version(db, user_id)
+    key = (goal.id, version, n_paths, fracao, today)
+    cached = _simulation_cache.get(key)
+    if cached is not None:
+        return cached
+
+    necessario = int((goal.valor_necessario or 0) * 100)
+    reservado = int((goal.valor_reservado or 0) * 100)
+    months_left = months_between(today, goal.data_meta) if goal.data_meta else 0
+    if reservado >= necessario or months_left <= 0:
+        result = {
+            "meta_id": goal.id,
+            "probabilidade": 1.0 if reservado >= necessario else 0.0,
+            "meses_restantes": max(months_left, 0),
+            "caminhos": 0,
+        }
+        _simulation_cache.set(key, result)
+        return result
+
+    # Só limita o horizonte quando há caminhos a simular (metas atingidas ou vencidas respondem acima)
+    if months_left > MAX_SIMULATION_MONTHS:
+        raise SimulationHorizonError(
+            f"A simulação cobre no máximo {MAX_SIMULATION_MONTHS} meses; a meta vence em {months_left} meses."
+        )
+
+    history = monthly_net_history(get_user_transactions(db, user_id), today)
+    if len(history) < MIN_HISTORY_MONTHS:
+        raise InsufficientHistoryError(
+            f"São necessários ao menos {MIN_HISTORY_MONTHS} meses de histórico de transações para a simulação."
+        )
+
+    reached, first_month, final = _run_simulation(
+        history, reservado, necessario, months_left, n_paths, fracao, seed=(goal.id, version)
+    )
+    p10, p50, p90 = np.percentile(final, [10, 50, 90]) / 100.0
+    hit_months = first_month[reached]
+
+    result = {
+        "meta_id": goal.id,
+        "probabilidade": round(float(reached.mean()), 4),
+        "meses_restantes": months_left,
+        "caminhos": n_paths,
+        "fracao_fluxo": fracao,
+        "meses_historico": int(len(history)),
+        "fluxo_mensal_medio": round(float(history.mean()) / 100.0, 2),
+        "saldo_final_meta": {"p10": round(p10, 2), "p50": round(p50, 2), "p90": round(p90, 2)},
+        "mes_mediano_conclusao": (
+            add_months(today, int(np.median(hit_months))).strftime('%Y-%m') if len(hit_months) else None
+        ),
+    }
+    _simulation_cache.set(key, result)
+    return result
@@ -0,0 +1,116 @@
+# personal_finance_api/services/inventory_forecast.py
+from datetime import date, datetime, time, timedelta, timezone
+
+import numpy as np
+
+from database.models import EstoquePessoal, MovimentoEstoque
+from services.data_version import get_data_version
+from services.result_cache import ResultCache
+
+DEFAULT_HISTORY_DAYS = 180
+MAX_HISTORY_DAYS = 730
+# Evita taxas infladas para itens acompanhados há menos de um dia
+MIN_SPAN_DAYS = 1.0
+# Projeções além deste horizonte saem sem dias restantes nem data de fim (consumo quase nulo);
+# também mantém as datas dentro do limite de date (ano 9999)
+MAX_PROJECTION_DAYS = 100 * 365
+
+_SECONDS_PER_DAY = 86400.0
+
+_forecast_cache = ResultCache(max_entries=512)
+
+
+def _to_days(value):
+    # Datas e datetimes (com ou sem fuso) em dias desde a época, como float
+    if value is None:
+        return np.nan
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.min)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp() / _SECONDS_PER_DAY
+
+
+def consumption_rates(item_ids, added_days, event_item_ids, event_days, event_deltas, now_days, window_start_days):
+    # Consumo diário de todos os itens em uma passada: soma das reduções de quantidade na janela
+    # dividida pelo tempo acompanhado (desde a adição do item ou o primeiro evento, limitado à janela)
+    positions = np.searchsorted(item_ids, event_item_ids)
+    consumed = np.zeros(len(item_ids), dtype=np.float64)
+    first_event = np.full(len(item_ids), np.inf)
+    in_window = event_days >= window_start_days
+    np.add.at(consumed, positions[in_window], np.where(event_deltas[in_window] < 0, -event_deltas[in_window], 0))
+    np.minimum.at(first_event, positions, event_days)
+    events = np.bincount(positions[in_window], minlength=len(item_ids))
+
+    started = np.fmin(added_days, first_event)
+    started = np.where(np.isfinite(started), started, now_days)
+    span = np.maximum(now_days - np.maximum(started, window_start_days), MIN_SPAN_DAYS)
+    return consumed / span, events
+
+
+def _compute_forecast(db, user_id, history_days, today):
+    # Referência derivada de `today` (parte da chave do cache), e não do relógio: fim do dia,
+    # para incluir todos os movimentos de hoje
+    now = datetime.combine(today + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    now_days = now.timestamp() / _SECONDS_PER_DAY
+    window_start = now - timedelta(days=history_days)
+
+    items = db.query(
+        EstoquePessoal.id,
+        EstoquePessoal.nome,
+        EstoquePessoal.unidade,
+        EstoquePessoal.quantidade,
+        EstoquePessoal.data_adicionado,
+    ).filter(EstoquePessoal.usuario_id == int(user_id)).order_by(EstoquePessoal.id).all()
+
+    # Apenas o necessário do registro de movimentos: item, momento e variação
+    events = db.query(
+        MovimentoEstoque.estoque_id,
+        MovimentoEstoque.registrado_em,
+        MovimentoEstoque.variacao,
+    ).filter(MovimentoEstoque.usuario_id == int(user_id)).all()
+
+    item_ids = np.array([item.id for item in items], dtype=np.int64)
+    added_days = np.array([_to_days(item.data_adicionado) for item in items], dtype=np.float64)
+    quantities = np.array([item.quantidade or 0 for item in items], dtype=np.float64)
+
+    event_item_ids = np.array([event.estoque_id for event in events], dtype=np.int64)
+    event_days = np.array([_to_days(event.registrado_em) for event in events], dtype=np.float64)
+    event_deltas = np.array([event.variacao for event in events], dtype=np.float64)
+    known = np.isin(event_item_ids, item_ids)
+
+    rates, counts = consumption_rates(
+        item_ids, added_days, event_item_ids[known], event_days[known], event_deltas[known],
+        now_days, _to_days(window_start)
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_left = np.where(rates > 0, quantities / rates, np.inf)
+    days_left[days_left > MAX_PROJECTION_DAYS] = np.inf
+
+    order = np.argsort(days_left, kind='stable')
+    result = []
+    for i in order:
+        item = items[i]
+        finite = np.isfinite(days_left[i])
+        result.append({
+            "id": item.id,
+            "nome": item.nome,
+            "unidade": item.unidade,
+            "quantidade": item.quantidade,
+            "consumo_diario": round(float(rates[i]), 4),
+            "movimentos": int(counts[i]),
+            "dias_restantes": round(float(days_left[i]), 1) if finite else None,
+            "data_prevista_fim": (today + timedelta(days=int(days_left[i]))).isoformat() if finite else None,
+        })
+
+    return {
+        "data_referencia": today.isoformat(),
+        "dias_historico": history_days,
+        "itens": result,
+    }
+
+
+def forecast_inventory(db, user_id, history_days=DEFAULT_HISTORY_DAYS, today=None):
+    today = today or date.today()
+    key = (int(user_id), get_data_version(db, user_id), history_days, today)
+    return _forecast_cache.get_or_compute(key, lambda: _compute_forecast(db, user_id, history_days, today))
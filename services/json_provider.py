@@ -0,0 +1,76 @@
+# personal_finance_api/services/json_provider.py
+import dataclasses
+import decimal
+import os
+from datetime import date, datetime, time
+from enum import Enum
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dependência opcional: sem ela usa o json da biblioteca padrão
+    orjson = None
+
+# JSON_PROVIDER=stdlib força o json padrão mesmo com o orjson instalado (comparações, depuração)
+JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson' if orjson else 'stdlib').lower()
+
+
+def encode_default(value):
+    # Tipos que nem o orjson nem o json padrão serializam sozinhos.
+    # Numeric sai como número (float), como os to_dict faziam com float().
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if type(value).__module__ == 'numpy':
+        # Escalares e arrays NumPy (o orjson não aceita nem as subclasses de float)
+        return value.tolist()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f"Objeto do tipo {type(value).__name__} não é serializável em JSON")
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """json padrão, mas com datas em ISO 8601 (o Flask usa o formato HTTP) e Decimal como número."""
+
+    default = staticmethod(encode_default)
+    # A ordem das chaves segue os to_dict; ordenar custa tempo em listas grandes
+    sort_keys = False
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """Serializa com orjson: date, datetime, Enum e UUID nativamente, Decimal via encode_default."""
+
+    def dumps(self, obj, **kwargs):
+        return self._dumps_bytes(obj, **kwargs).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Escreve os bytes do orjson direto no corpo, sem passar por str
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = self._dumps_bytes(obj, indent=2 if pretty else None)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+    def _dumps_bytes(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=encode_default, option=option)
+
+
+def get_json_provider_class():
+    if JSON_PROVIDER == 'orjson':
+        if orjson is not None:
+            return OrjsonProvider
+        print("AVISO: pacote 'orjson' não instalado; usando o json da biblioteca padrão.")
+    return StdlibJSONProvider
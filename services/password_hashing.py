@@ -0,0 +1,73 @@
+# personal_finance_api/services/password_hashing.py
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Método no formato do werkzeug: 'scrypt', 'scrypt:32768:8:1', 'pbkdf2:sha256:600000', ...
+PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+# 0 desativa o pool de processos e calcula o hash no próprio worker
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', min(2, os.cpu_count() or 1)))
+# Limite de hashes em andamento ou na fila por processo; acima disso a requisição recebe 503
+PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', max(PASSWORD_HASH_WORKERS, 1) * 4))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 5))
+
+
+class HashingBusyError(Exception):
+    pass
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+
+
+def _get_executor():
+    # Criado sob demanda e por processo: um pool herdado via fork (gunicorn --preload) não é reutilizável
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _shutdown_executor():
+    if _executor is not None and _executor_pid == os.getpid():
+        _executor.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_shutdown_executor)
+
+
+def _run(func, *args):
+    if not _slots.acquire(timeout=PASSWORD_HASH_QUEUE_TIMEOUT):
+        raise HashingBusyError("Servidor ocupado processando autenticações. Tente novamente em instantes.")
+    try:
+        if PASSWORD_HASH_WORKERS <= 0:
+            return func(*args)
+        return _get_executor().submit(func, *args).result()
+    finally:
+        _slots.release()
+
+
+def hash_password(password):
+    return _run(generate_password_hash, password, PASSWORD_HASH_METHOD)
+
+
+def verify_password(hashed_password, password):
+    return _run(check_password_hash, hashed_password, password)
+
+
+@lru_cache(maxsize=1)
+def _method_prefix():
+    # Parâmetros completos do método configurado (o werkzeug preenche os padrões omitidos)
+    return generate_password_hash('', PASSWORD_HASH_METHOD).split('$', 1)[0]
+
+
+def needs_rehash(hashed_password):
+    return hashed_password.split('$', 1)[0] != _method_prefix()
@@ -0,0 +1,135 @@
+# personal_finance_api/services/price_analytics.py
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from database.models import Produto, HistoricoPrecoProduto
+from services.bill_schedule import add_months
+from services.data_version import get_data_version
+from services.result_cache import ResultCache
+
+DEFAULT_ANALYTICS_MONTHS = 24
+MAX_ANALYTICS_MONTHS = 60
+DEFAULT_ROLLING_WINDOW = 3
+MAX_ROLLING_WINDOW = 12
+
+_analytics_cache = ResultCache(max_entries=512)
+
+
+def load_price_frame(db, user_id, start):
+    # Uma única consulta com todos os preços do usuário no período
+    rows = db.query(
+        HistoricoPrecoProduto.produto_id,
+        Produto.nome,
+        HistoricoPrecoProduto.data_registro,
+        HistoricoPrecoProduto.preco,
+    ).join(Produto, Produto.id == HistoricoPrecoProduto.produto_id)\
+     .filter(Produto.usuario_id == int(user_id), HistoricoPrecoProduto.data_registro >= start)\
+     .all()
+
+    frame = pd.DataFrame(rows, columns=['produto_id', 'nome', 'data', 'preco'])
+    frame['data'] = pd.to_datetime(frame['data'])
+    frame['preco'] = frame['preco'].astype(float)
+    return frame
+
+
+def monthly_price_matrix(frame, start, today, window):
+    # Meses x produtos: mediana mensal, lacunas preenchidas com o último preço e suavizada por mediana móvel
+    monthly = frame.groupby(['produto_id', pd.Grouper(key='data', freq='MS')])['preco'].median().unstack(0)
+    months = pd.date_range(pd.Timestamp(start).to_period('M').to_timestamp(),
+                           pd.Timestamp(today).to_period('M').to_timestamp(), freq='MS')
+    monthly = monthly.reindex(months)
+    observed = monthly.notna()
+    smoothed = monthly.ffill().rolling(window, min_periods=1).median()
+    return smoothed, observed
+
+
+def trend_slopes(matrix):
+    # Mínimos quadrados por coluna, ignorando meses sem preço; retorna a inclinação em R$/mês
+    y = matrix.to_numpy()
+    valid = ~np.isnan(y)
+    x = np.arange(len(matrix), dtype=float)[:, None]
+    n = valid.sum(axis=0)
+    xv = np.where(valid, x, 0.0)
+    yv = np.where(valid, y, 0.0)
+    sx, sy = xv.sum(axis=0), yv.sum(axis=0)
+    sxx, sxy = (xv * xv).sum(axis=0), (xv * yv).sum(axis=0)
+    denominator = n * sxx - sx * sx
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slopes = np.where(denominator > 0, (n * sxy - sx * sy) / denominator, np.nan)
+        means = np.where(n > 0, sy / n, np.nan)
+    return slopes, means, n
+
+
+def inflation_index(matrix):
+    # Índice encadeado (base 100): média geométrica das variações mês a mês
+    # dos produtos com preço nos dois meses consecutivos
+    y = matrix.to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        log_relatives = np.log(y[1:] / y[:-1])
+    finite = np.isfinite(log_relatives)
+    counts = finite.sum(axis=1)
+    mean_log = np.where(finite, log_relatives, 0.0).sum(axis=1) / np.maximum(counts, 1)
+    index = 100.0 * np.exp(np.concatenate(([0.0], np.cumsum(mean_log))))
+    return index, np.concatenate(([0], counts))
+
+
+def _rounded(value, digits):
+    # NaN/inf não são JSON válido (o json padrão escreveria NaN): saem como null
+    value = float(value)
+    return round(value, digits) if np.isfinite(value) else None
+
+
+def _compute_analytics(db, user_id, months, window, today):
+    start = add_months(today.replace(day=1), -(months - 1))
+    frame = load_price_frame(db, user_id, start)
+    result = {
+        "data_inicial": start.isoformat(),
+        "data_final": today.isoformat(),
+        "meses": months,
+        "janela_mediana": window,
+        "indice_inflacao": [],
+        "inflacao_acumulada": None,
+        "inflacao_12_meses": None,
+        "produtos": [],
+    }
+    if frame.empty:
+        return result
+
+    matrix, observed = monthly_price_matrix(frame, start, today, window)
+    index, counts = inflation_index(matrix)
+    slopes, means, n = trend_slopes(matrix.where(observed))
+    names = frame.drop_duplicates('produto_id').set_index('produto_id')['nome']
+    last_prices = matrix.ffill().iloc[-1]
+
+    result["indice_inflacao"] = [
+        {"mes": month.strftime('%Y-%m'), "indice": _rounded(value, 2), "produtos": int(count)}
+        for month, value, count in zip(matrix.index, index, counts)
+    ]
+    result["inflacao_acumulada"] = _rounded((index[-1] / index[0] - 1) * 100, 2)
+    if len(index) > 12:
+        result["inflacao_12_meses"] = _rounded((index[-1] / index[-13] - 1) * 100, 2)
+
+    produtos = []
+    for i, produto_id in enumerate(matrix.columns):
+        slope = slopes[i]
+        produtos.append({
+            "produto_id": int(produto_id),
+            "nome": names[produto_id],
+            "meses_com_preco": int(n[i]),
+            "preco_medio": _rounded(means[i], 2),
+            "ultimo_preco_suavizado": _rounded(last_prices[produto_id], 2),
+            "tendencia_mensal": _rounded(slope, 4),
+            "tendencia_mensal_percentual": _rounded(slope / means[i] * 100, 2) if means[i] else None,
+        })
+    # Produtos com maior alta primeiro; sem tendência calculável ao final
+    produtos.sort(key=lambda p: (p["tendencia_mensal_percentual"] is None, -(p["tendencia_mensal_percentual"] or 0)))
+    result["produtos"] = produtos
+    return result
+
+
+def price_analytics(db, user_id, months=DEFAULT_ANALYTICS_MONTHS, window=DEFAULT_ROLLING_WINDOW, today=None):
+    today = today or date.today()
+    key = (int(user_id), get_data_version(db, user_id), months, window, today)
+    return _analytics_cache.get_or_compute(key, lambda: _compute_analytics(db, user_id, months, window, today))
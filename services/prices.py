@@ -0,0 +1,92 @@
+# personal_finance_api/services/prices.py
+from sqlalchemy import func, insert
+
+from database.models import Produto, HistoricoPrecoProduto
+
+# Unidades de agrupamento aceitas por date_trunc nas estatísticas de preço
+PRICE_PERIODS = ('day', 'week', 'month', 'year')
+
+
+def latest_prices_query(db, user_id, produto_ids=None):
+    # Último preço de cada produto do usuário em uma única instrução:
+    # SELECT DISTINCT ON (produto_id) ... ORDER BY produto_id, data_registro DESC, id DESC
+    # (percorre ix_historico_preco_produto_produto_id_data_registro de trás para frente).
+    query = db.query(
+        HistoricoPrecoProduto.produto_id,
+        HistoricoPrecoProduto.preco,
+        HistoricoPrecoProduto.data_registro,
+        HistoricoPrecoProduto.local_compra,
+    ).join(Produto, Produto.id == HistoricoPrecoProduto.produto_id)\
+     .filter(Produto.usuario_id == int(user_id))
+    if produto_ids is not None:
+        query = query.filter(HistoricoPrecoProduto.produto_id.in_(list(produto_ids)))
+    return query.distinct(HistoricoPrecoProduto.produto_id)\
+                .order_by(
+                    HistoricoPrecoProduto.produto_id,
+                    HistoricoPrecoProduto.data_registro.desc(),
+                    HistoricoPrecoProduto.id.desc()
+                )
+
+
+def normalize_product_name(nome):
+    # Mesma normalização aplicada no SQL por normalized_name_column: lower(trim(nome))
+    return (nome or '').strip().lower()
+
+
+def normalized_name_column():
+    return func.lower(func.trim(Produto.nome))
+
+
+def latest_prices_by_name(db, user_id, nomes):
+    # Último preço por nome normalizado de produto, em uma única instrução DISTINCT ON.
+    # Retorna {nome_normalizado: (produto_id, preco, data_registro)}.
+    nomes = {normalize_product_name(nome) for nome in nomes if nome and nome.strip()}
+    if not nomes:
+        return {}
+    nome_normalizado = normalized_name_column().label('nome_normalizado')
+    rows = db.query(
+        nome_normalizado,
+        HistoricoPrecoProduto.produto_id,
+        HistoricoPrecoProduto.preco,
+        HistoricoPrecoProduto.data_registro,
+    ).join(Produto, Produto.id == HistoricoPrecoProduto.produto_id)\
+     .filter(Produto.usuario_id == int(user_id), normalized_name_column().in_(nomes))\
+     .distinct(normalized_name_column())\
+     .order_by(
+         normalized_name_column(),
+         HistoricoPrecoProduto.data_registro.desc(),
+         HistoricoPrecoProduto.id.desc()
+     ).all()
+
+    latest = {}
+    for nome, produto_id, preco, data_registro in rows:
+        latest.setdefault(nome, (produto_id, preco, data_registro))
+    return latest
+
+
+def resolve_products_by_name(db, user_id, itens):
+    # Mapeia nomes normalizados para produtos do usuário, criando os que faltam em um único INSERT.
+    # `itens` é um iterável de (nome, unidade_medida, categoria_produto); retorna ({nome_normalizado: produto_id}, criados).
+    novos = {}
+    for nome, unidade, categoria in itens:
+        chave = normalize_product_name(nome)
+        if chave:
+            novos.setdefault(chave, {"nome": nome.strip(), "unidade_medida": unidade, "categoria_produto": categoria})
+    if not novos:
+        return {}, 0
+
+    produtos = {}
+    rows = db.query(normalized_name_column(), Produto.id)\
+             .filter(Produto.usuario_id == int(user_id), normalized_name_column().in_(novos.keys()))\
+             .order_by(Produto.id).all()
+    for chave, produto_id in rows:
+        produtos.setdefault(chave, produto_id)
+
+    faltando = [chave for chave in novos if chave not in produtos]
+    if faltando:
+        created = db.execute(
+            insert(Produto).returning(Produto.id, sort_by_parameter_order=True),
+            [{"usuario_id": int(user_id), **novos[chave]} for chave in faltando]
+        ).scalars().all()
+        produtos.update(zip(faltando, created))
+    return produtos, len(faltando)
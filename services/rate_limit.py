@@ -0,0 +1,207 @@
+# personal_finance_api/services/rate_limit.py
+import math
+import os
+import threading
+import time
+
+from flask import g, jsonify, request
+from flask_jwt_extended import JWTManager, get_jwt_identity, verify_jwt_in_request
+
+from database.db import DB_POOL_SIZE, DB_MAX_OVERFLOW
+
+# Orçamentos por endpoint: "capacidade/segundos" (ex.: 10/60 = rajada de 10, recarga de 10 a cada 60s).
+# Cada um pode ser sobrescrito por variável de ambiente, e "0" desativa o limite do endpoint.
+ENDPOINT_BUDGETS = {
+    'auth.login_user': os.getenv('RATE_LIMIT_LOGIN', '10/60'),
+    'auth.register_user': os.getenv('RATE_LIMIT_REGISTER', '5/600'),
+    'auth.refresh_access_token': os.getenv('RATE_LIMIT_REFRESH', '30/60'),
+    'transactions.import_transactions': os.getenv('RATE_LIMIT_IMPORT', '5/60'),
+    'transactions.export_transactions': os.getenv('RATE_LIMIT_EXPORT', '10/60'),
+}
+DEFAULT_BUDGET = os.getenv('RATE_LIMIT_DEFAULT', '600/60')
+
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() not in ('false', '0', 'no')
+# Atrás de um proxy (Render, nginx) o IP do cliente vem no primeiro item de X-Forwarded-For
+RATE_LIMIT_TRUST_PROXY = os.getenv('RATE_LIMIT_TRUST_PROXY', 'false').lower() in ('true', '1', 'yes')
+# Ex.: redis://localhost:6379/0 para compartilhar os contadores entre workers
+RATE_LIMIT_STORAGE_URL = os.getenv('RATE_LIMIT_STORAGE_URL', 'memory://')
+
+# Admissão: requisições simultâneas por processo. O padrão acompanha o pool do banco
+# (pool_size + max_overflow) para recusar com 503 antes de esgotar as conexões.
+MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', DB_POOL_SIZE + DB_MAX_OVERFLOW))
+ADMISSION_TIMEOUT = float(os.getenv('ADMISSION_TIMEOUT', 2))
+
+# /internal/* (sondagens e métricas) fica fora dos limites e da admissão: precisa responder
+# justamente quando o servidor está ocupado
+_EXEMPT_ENDPOINTS = {'static', 'hello_world'}
+_EXEMPT_BLUEPRINTS = {'internal'}
+
+
+def parse_budget(value):
+    # "10/60" -> (capacidade, fichas por segundo); "0" ou vazio -> None (sem limite)
+    if not value or value.strip() == '0':
+        return None
+    capacity, _, seconds = value.partition('/')
+    capacity = float(capacity)
+    seconds = float(seconds or 1)
+    return capacity, capacity / seconds
+
+
+class MemoryBackend:
+    """Baldes de fichas em memória, por processo."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, cost=1.0):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                allowed, retry_after = True, 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, retry_after = False, (cost - tokens) / rate
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+        return allowed, retry_after
+
+    def _prune(self, now):
+        # Remove os baldes mais antigos (os que estariam cheios de novo são os primeiros a sair)
+        oldest = sorted(self._buckets, key=lambda k: self._buckets[k][1])
+        for key in oldest[:len(self._buckets) - self.max_keys // 2]:
+            del self._buckets[key]
+
+
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBackend:
+    """Baldes compartilhados entre workers em um Redis (script Lua atômico)."""
+
+    def __init__(self, url):
+        import redis  # dependência opcional, só carregada quando configurada
+
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+
+    def consume(self, key, capacity, rate, cost=1.0):
+        allowed, tokens = self._script(keys=[f"ratelimit:{key}"], args=[capacity, rate, time.time(), cost])
+        if int(allowed):
+            return True, 0.0
+        return False, (cost - float(tokens)) / rate
+
+
+def create_backend(url):
+    if url.startswith(('redis://', 'rediss://')):
+        try:
+            return RedisBackend(url)
+        except ImportError:
+            print("AVISO: pacote 'redis' não instalado; usando limites de requisição em memória.")
+    return MemoryBackend()
+
+
+def _client_ip():
+    if RATE_LIMIT_TRUST_PROXY and request.headers.get('X-Forwarded-For'):
+        return request.headers['X-Forwarded-For'].split(',')[0].strip()
+    return request.remote_addr or 'desconhecido'
+
+
+class RequestCachedJWTManager(JWTManager):
+    """JWTManager que decodifica cada token uma única vez por requisição.
+
+    O limitador verifica o token antes da rota, e o @jwt_required da rota o verifica de novo;
+    com o resultado guardado em g, a segunda verificação reaproveita a decodificação.
+    """
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        cache = g.setdefault('_decoded_jwts', {})
+        key = (encoded_token, csrf_value, allow_expired)
+        if key not in cache:
+            cache[key] = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        return cache[key]
+
+
+def _client_keys():
+    # Cada requisição consome o balde do IP e, com um token válido, também o do usuário:
+    # um usuário não escapa do limite trocando de IP, nem um IP trocando de conta
+    keys = [f"ip:{_client_ip()}"]
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        identity = None
+    if identity is not None:
+        keys.append(f"user:{identity}")
+    return keys
+
+
+def _too_many_requests(retry_after):
+    response = jsonify({"message": "Muitas requisições. Tente novamente em instantes."})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def _server_busy():
+    response = jsonify({"message": "Servidor sobrecarregado. Tente novamente em instantes."})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+
+def init_rate_limiting(app):
+    budgets = {endpoint: parse_budget(value) for endpoint, value in ENDPOINT_BUDGETS.items()}
+    default_budget = parse_budget(DEFAULT_BUDGET)
+    backend = create_backend(RATE_LIMIT_STORAGE_URL)
+    admission = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS) if MAX_CONCURRENT_REQUESTS > 0 else None
+
+    @app.before_request
+    def limit_request():
+        if (request.method == 'OPTIONS' or request.endpoint in _EXEMPT_ENDPOINTS
+                or request.blueprint in _EXEMPT_BLUEPRINTS):
+            return None
+
+        if RATE_LIMIT_ENABLED:
+            budget = budgets.get(request.endpoint, default_budget)
+            if budget is not None:
+                # Endpoints com orçamento próprio têm um balde separado do orçamento geral
+                scope = request.endpoint if request.endpoint in budgets else 'default'
+                for key in _client_keys():
+                    allowed, retry_after = backend.consume(f"{scope}:{key}", *budget)
+                    if not allowed:
+                        return _too_many_requests(retry_after)
+
+        if admission is not None:
+            if not admission.acquire(timeout=ADMISSION_TIMEOUT):
+                return _server_busy()
+            g._admission_acquired = True
+        return None
+
+    @app.teardown_request
+    def release_admission(exception=None):
+        if g.pop('_admission_acquired', False):
+            admission.release()
+
+    return backend
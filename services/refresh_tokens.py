@@ -0,0 +1,127 @@
+# personal_finance_api/services/refresh_tokens.py
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
+
+from database.models import RefreshToken
+
+
+class RefreshTokenError(Exception):
+    pass
+
+
+class RefreshTokenReuseError(RefreshTokenError):
+    pass
+
+
+# Claim com a família (sessão) do token; access e refresh tokens de um mesmo login a compartilham
+FAMILY_CLAIM = 'fam'
+
+
+class TokenDenylist:
+    """Conjunto em memória (por worker) de famílias de sessão revogadas.
+
+    Cada entrada só precisa durar até o último access token da família expirar.
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add(self, key, expires_at):
+        with self._lock:
+            self._entries[key] = expires_at
+            if len(self._entries) > self.max_entries:
+                self._prune()
+
+    def contains(self, key):
+        with self._lock:
+            expires_at = self._entries.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.time():
+                del self._entries[key]
+                return False
+            return True
+
+    def _prune(self):
+        now = time.time()
+        for key in [key for key, expires_at in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        # Ainda cheio: descarta as que expiram primeiro
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            for key in sorted(self._entries, key=self._entries.get)[:overflow]:
+                del self._entries[key]
+
+
+session_denylist = TokenDenylist(int(os.getenv('SESSION_DENYLIST_MAX_ENTRIES', 100000)))
+
+
+def is_token_revoked(jwt_payload):
+    # Chamado pelo flask_jwt_extended em toda requisição autenticada: só memória, sem banco.
+    # Apenas access tokens são barrados aqui; refresh tokens precisam chegar a
+    # rotate_refresh_token, onde o reuso de um token rotacionado revoga a família inteira.
+    return jwt_payload.get('type') == 'access' and session_denylist.contains(jwt_payload.get(FAMILY_CLAIM))
+
+
+def _access_token_ttl():
+    expires = current_app.config.get('JWT_ACCESS_TOKEN_EXPIRES', timedelta(minutes=15))
+    if isinstance(expires, timedelta):
+        return expires.total_seconds()
+    return float(expires) if expires else float('inf')
+
+
+def issue_access_token(user_id, familia):
+    return create_access_token(identity=str(user_id), additional_claims={FAMILY_CLAIM: familia})
+
+
+def issue_refresh_token(db, user_id, familia=None):
+    # Emite e registra um refresh token; o commit fica a cargo da rota
+    familia = familia or str(uuid.uuid4())
+    token = create_refresh_token(identity=str(user_id), additional_claims={FAMILY_CLAIM: familia})
+    payload = decode_token(token)
+    now = datetime.now(timezone.utc)
+    db.query(RefreshToken).filter(
+        RefreshToken.user_id == int(user_id), RefreshToken.expira_em < now
+    ).delete(synchronize_session=False)
+    db.add(RefreshToken(
+        jti=payload['jti'],
+        familia=familia,
+        user_id=int(user_id),
+        expira_em=datetime.fromtimestamp(payload['exp'], tz=timezone.utc),
+    ))
+    return token, payload['jti'], familia
+
+
+def revoke_family(db, familia):
+    # Refresh tokens no banco; access tokens já emitidos barrados neste worker até expirarem
+    session_denylist.add(familia, time.time() + _access_token_ttl())
+    return db.query(RefreshToken).filter(
+        RefreshToken.familia == familia, RefreshToken.revogado_em.is_(None)
+    ).update({RefreshToken.revogado_em: datetime.now(timezone.utc)}, synchronize_session=False)
+
+
+def rotate_refresh_token(db, jwt_payload):
+    # Troca o refresh token apresentado por um novo da mesma família.
+    # Apresentar um token já rotacionado indica vazamento: a família inteira é revogada.
+    # Por isso refresh tokens não passam pelo session_denylist: precisam chegar até aqui
+    # para que o reuso seja detectado.
+    row = db.query(RefreshToken).filter_by(jti=jwt_payload['jti']).with_for_update().first()
+    if row is None or str(row.user_id) != str(jwt_payload['sub']):
+        raise RefreshTokenError("Refresh token inválido.")
+    if row.revogado_em is not None:
+        revoke_family(db, row.familia)
+        raise RefreshTokenReuseError("Refresh token reutilizado. A sessão foi encerrada; faça login novamente.")
+
+    token, jti, familia = issue_refresh_token(db, row.user_id, familia=row.familia)
+    row.revogado_em = datetime.now(timezone.utc)
+    row.substituido_por = jti
+    return token, familia
+
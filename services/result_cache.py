@@ -0,0 +1,47 @@
+# personal_finance_api/services/result_cache.py
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class ResultCache:
+    """LRU simples por worker para resultados derivados (projeções, simulações, análises).
+
+    As chaves devem incluir a `data_version` do usuário: assim nenhuma invalidação
+    explícita é necessária e entradas antigas simplesmente saem pelo fim da fila.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,15 @@
+# personal_finance_api/services/stock_movements.py
+from database.models import MovimentoEstoque
+
+
+def record_stock_movement(db, item, quantidade_anterior=0):
+    # Acrescenta um evento ao registro de movimentos quando a quantidade do item muda
+    quantidade = item.quantidade or 0
+    variacao = quantidade - (quantidade_anterior or 0)
+    if variacao:
+        db.add(MovimentoEstoque(
+            estoque=item,
+            usuario_id=int(item.usuario_id),
+            quantidade=quantidade,
+            variacao=variacao,
+        ))
@@ -0,0 +1,243 @@
+# personal_finance_api/services/transaction_cache.py
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+
+from database.models import Transacao
+from services.data_version import get_data_version
+
+# Códigos compactos (int8) para os enums de Transacao
+TIPO_CODES = {'RECEITA': 1, 'DESPESA': 2}
+STATUS_CODES = {'PENDENTE': 1, 'PAGO': 2, 'RECEBIDO': 3, 'CANCELADO': 4}
+
+# Valores legados gravados por rotas antigas ('income'/'expense', 'receita'/'despesa')
+_TIPO_ALIASES = {'INCOME': 'RECEITA', 'EXPENSE': 'DESPESA'}
+
+# Sentinelas para colunas anuláveis
+NO_DATE = 0
+NO_ID = -1
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _enum_value(value):
+    if value is None:
+        return None
+    value = getattr(value, 'value', value)
+    return str(value).upper()
+
+
+def _to_cents(valor):
+    # Numeric(10, 2) chega como Decimal exato; multiplicar por 100 não perde precisão
+    return int(valor * 100) if valor is not None else 0
+
+
+def ordinals_to_datetime64(ordinals):
+    return (np.asarray(ordinals, dtype=np.int64) - _EPOCH_ORDINAL).astype('datetime64[D]')
+
+
+class TransactionColumns:
+    """Transações de um usuário em arrays NumPy paralelos (uma linha por transação).
+
+    `cents` é o valor com sinal: positivo para RECEITA e negativo para DESPESA.
+    """
+
+    __slots__ = ('ids', 'cents', 'dates', 'due_dates', 'categoria_ids', 'conta_ids', 'tipos', 'status')
+
+    def __init__(self, ids, cents, dates, due_dates, categoria_ids, conta_ids, tipos, status):
+        self.ids = ids
+        self.cents = cents
+        self.dates = dates
+        self.due_dates = due_dates
+        self.categoria_ids = categoria_ids
+        self.conta_ids = conta_ids
+        self.tipos = tipos
+        self.status = status
+
+    @classmethod
+    def from_rows(cls, rows):
+        n = len(rows)
+        ids = np.empty(n, dtype=np.int64)
+        cents = np.empty(n, dtype=np.int64)
+        dates = np.empty(n, dtype=np.int32)
+        due_dates = np.empty(n, dtype=np.int32)
+        categoria_ids = np.empty(n, dtype=np.int32)
+        conta_ids = np.empty(n, dtype=np.int32)
+        tipos = np.empty(n, dtype=np.int8)
+        status = np.empty(n, dtype=np.int8)
+
+        for i, (t_id, valor, data, data_vencimento, categoria_id, conta_id, tipo, t_status) in enumerate(rows):
+            tipo_value = _enum_value(tipo)
+            tipo_value = _TIPO_ALIASES.get(tipo_value, tipo_value)
+            tipo_code = TIPO_CODES.get(tipo_value, 0)
+            valor_cents = _to_cents(valor)
+
+            ids[i] = t_id
+            cents[i] = -valor_cents if tipo_code == TIPO_CODES['DESPESA'] else valor_cents
+            dates[i] = data.toordinal() if data else NO_DATE
+            due_dates[i] = data_vencimento.toordinal() if data_vencimento else NO_DATE
+            categoria_ids[i] = categoria_id if categoria_id is not None else NO_ID
+            conta_ids[i] = conta_id
+            tipos[i] = tipo_code
+            status[i] = STATUS_CODES.get(_enum_value(t_status), 0)
+
+        return cls(ids, cents, dates, due_dates, categoria_ids, conta_ids, tipos, status)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
+
+    def _take(self, mask):
+        return TransactionColumns(*(getattr(self, name)[mask] for name in self.__slots__))
+
+    def filter(self, start=None, end=None, due_start=None, due_end=None, tipo=None, status=None,
+               conta_ids=None, categoria_ids=None):
+        # Datas são `date` inclusivas; tipo/status aceitam o valor do enum ou uma lista de valores
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.dates >= start.toordinal()
+        if end is not None:
+            mask &= self.dates <= end.toordinal()
+        if due_start is not None:
+            mask &= self.due_dates >= due_start.toordinal()
+        if due_end is not None:
+            mask &= (self.due_dates != NO_DATE) & (self.due_dates <= due_end.toordinal())
+        if tipo is not None:
+            mask &= np.isin(self.tipos, _codes(TIPO_CODES, tipo))
+        if status is not None:
+            mask &= np.isin(self.status, _codes(STATUS_CODES, status))
+        if conta_ids is not None:
+            mask &= np.isin(self.conta_ids, np.asarray(list(conta_ids), dtype=np.int32))
+        if categoria_ids is not None:
+            mask &= np.isin(self.categoria_ids, np.asarray(list(categoria_ids), dtype=np.int32))
+        return self._take(mask)
+
+    def sum(self):
+        return int(self.cents.sum())
+
+    def group_keys(self, by):
+        if by == 'categoria_id':
+            return self.categoria_ids
+        if by == 'conta_id':
+            return self.conta_ids
+        if by == 'day':
+            return self.dates
+        if by == 'month':
+            return ordinals_to_datetime64(self.dates).astype('datetime64[M]').astype(np.int64)
+        raise ValueError(f"Agrupamento inválido: {by}")
+
+    def group_sum(self, by):
+        # Retorna {chave: centavos}; 'month' usa chaves 'YYYY-MM' e 'day' usa objetos date
+        if not len(self):
+            return {}
+        keys, inverse = np.unique(self.group_keys(by), return_inverse=True)
+        sums = np.zeros(len(keys), dtype=np.int64)
+        np.add.at(sums, inverse, self.cents)
+
+        if by == 'month':
+            labels = [str(k) for k in keys.astype('datetime64[M]')]
+        elif by == 'day':
+            labels = [date.fromordinal(int(k)) for k in keys]
+        else:
+            labels = [int(k) for k in keys]
+        return {label: int(total) for label, total in zip(labels, sums)}
+
+
+def _codes(mapping, values):
+    if isinstance(values, (str, bytes)) or not hasattr(values, '__iter__'):
+        values = [values]
+    return np.asarray([mapping[_enum_value(v)] for v in values], dtype=np.int8)
+
+
+def load_transaction_columns(db, user_id):
+    rows = db.query(
+        Transacao.id,
+        Transacao.valor,
+        Transacao.data,
+        Transacao.data_vencimento,
+        Transacao.categoria_id,
+        Transacao.conta_id,
+        Transacao.tipo,
+        Transacao.status,
+    ).filter(Transacao.user_id == int(user_id)).all()
+    return TransactionColumns.from_rows(rows)
+
+
+class TransactionCache:
+    """Cache LRU por worker, limitado em bytes, das transações de cada usuário.
+
+    Cada entrada guarda a `data_version` do usuário no momento da carga; uma versão
+    diferente no banco significa que a entrada está obsoleta e é recarregada.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, db, user_id):
+        user_id = int(user_id)
+        version = get_data_version(db, user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        columns = load_transaction_columns(db, user_id)
+        self._store(user_id, version, columns)
+        return columns
+
+    def _store(self, user_id, version, columns):
+        size = columns.nbytes
+        with self._lock:
+            self._discard(user_id)
+            if size > self.max_bytes:
+                return
+            self._entries[user_id] = (version, columns)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def _discard(self, user_id):
+        entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            self._bytes -= entry[1].nbytes
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._discard(int(user_id))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "usuarios": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+transaction_cache = TransactionCache(int(os.getenv('TRANSACTION_CACHE_MAX_BYTES', 32 * 1024 * 1024)))
+
+
+def get_user_transactions(db, user_id):
+    return transaction_cache.get(db, user_id)
@@ -0,0 +1,80 @@
+# personal_finance_api/services/user_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from werkzeug.local import LocalProxy
+
+from database.db import SessionLocal
+from database.models import User
+
+
+def _user_dict(user):
+    return {"id": user.id, "username": user.username, "email": user.email}
+
+
+class UserCache:
+    """Cache LRU com expiração (TTL) dos dados públicos de cada usuário, por worker.
+
+    A expiração limita a defasagem entre workers; no próprio worker, alterações
+    no usuário devem chamar `invalidate`.
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        user_id = int(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                return entry[1]
+
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter_by(id=user_id).first()
+            data = _user_dict(user) if user else None
+        finally:
+            db.close()
+
+        if data is not None:
+            with self._lock:
+                self._entries[user_id] = (now + self.ttl_seconds, data)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return data
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(int(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(
+    max_entries=int(os.getenv('USER_CACHE_MAX_ENTRIES', 1024)),
+    ttl_seconds=float(os.getenv('USER_CACHE_TTL_SECONDS', 300)),
+)
+
+
+def _load_current_user():
+    # Carregado apenas quando `current_user` é acessado, no máximo uma vez por requisição
+    if '_current_user' not in g:
+        identity = get_jwt_identity()
+        g._current_user = user_cache.get(identity) if identity is not None else None
+    return g._current_user
+
+
+# Dicionário {id, username, email} do usuário do token, ou None se ele não existir mais
+current_user = LocalProxy(_load_current_user)
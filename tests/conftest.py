@@ -0,0 +1,46 @@
+# personal_finance_api/tests/conftest.py
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Banco SQLite descartável; precisa estar definido antes de importar database.db
+_DB_FILE = os.path.join(tempfile.mkdtemp(), 'tests.db')
+os.environ['DATABASE_URL'] = f"sqlite:///{_DB_FILE}"
+
+from database.db import Base, engine, SessionLocal  # noqa: E402
+from database.models import User  # noqa: E402
+from services.result_cache import ResultCache  # noqa: E402
+
+
+def _clear_result_caches():
+    # O banco é recriado a cada teste: ids e data_version se repetem entre testes
+    for name, module in list(sys.modules.items()):
+        if name.startswith('services.'):
+            for value in vars(module).values():
+                if isinstance(value, ResultCache):
+                    value.clear()
+
+
+@pytest.fixture
+def db():
+    _clear_result_caches()
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        SessionLocal.remove()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def user(db):
+    user = User(username='teste', email='teste@example.com', hashed_password='x')
+    db.add(user)
+    db.commit()
+    return user
@@ -0,0 +1,37 @@
+# personal_finance_api/tests/test_goal_simulation.py
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from database.models import MetaFinanceira
+from services.goal_simulation import simulate_goal, SimulationHorizonError, MAX_SIMULATION_MONTHS
+from services.bill_schedule import add_months
+
+TODAY = date(2026, 1, 1)
+
+
+def _goal(db, user, necessario, reservado, meses):
+    goal = MetaFinanceira(
+        usuario_id=user.id, titulo='meta', valor_necessario=Decimal(necessario),
+        valor_reservado=Decimal(reservado), data_meta=add_months(TODAY, meses),
+    )
+    db.add(goal)
+    db.commit()
+    return goal
+
+
+def test_funded_goal_beyond_horizon_is_reached(db, user):
+    goal = _goal(db, user, '1000.00', '1000.00', MAX_SIMULATION_MONTHS + 240)
+
+    result = simulate_goal(db, user.id, goal, today=TODAY)
+
+    assert result["probabilidade"] == 1.0
+    assert result["caminhos"] == 0
+
+
+def test_unfunded_goal_beyond_horizon_is_rejected(db, user):
+    goal = _goal(db, user, '1000.00', '0.00', MAX_SIMULATION_MONTHS + 1)
+
+    with pytest.raises(SimulationHorizonError):
+        simulate_goal(db, user.id, goal, today=TODAY)
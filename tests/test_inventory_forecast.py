@@ -0,0 +1,54 @@
+# personal_finance_api/tests/test_inventory_forecast.py
+from datetime import date, datetime, timedelta, timezone
+
+from database.models import EstoquePessoal, MovimentoEstoque
+from services.inventory_forecast import forecast_inventory, MAX_PROJECTION_DAYS
+
+TODAY = date(2026, 1, 1)
+
+
+def _add_item(db, user, nome, quantidade, consumido, dias_atras):
+    item = EstoquePessoal(
+        usuario_id=user.id, nome=nome, quantidade=quantidade,
+        data_adicionado=TODAY - timedelta(days=dias_atras),
+    )
+    db.add(item)
+    db.flush()
+    db.add(MovimentoEstoque(
+        estoque_id=item.id, usuario_id=user.id, quantidade=quantidade, variacao=-consumido,
+        registrado_em=datetime.combine(TODAY - timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc),
+    ))
+    db.commit()
+    return item
+
+
+def test_projection_beyond_horizon_has_no_end_date(db, user):
+    # 1 unidade consumida em ~2 anos com 5000 em estoque: milhões de dias, além do ano 9999
+    _add_item(db, user, 'sal', quantidade=5000, consumido=1, dias_atras=729)
+
+    forecast = forecast_inventory(db, user.id, history_days=730, today=TODAY)
+
+    item = forecast["itens"][0]
+    assert item["consumo_diario"] >= 0
+    assert item["dias_restantes"] is None
+    assert item["data_prevista_fim"] is None
+
+
+def test_projection_within_horizon(db, user):
+    _add_item(db, user, 'arroz', quantidade=10, consumido=10, dias_atras=9)
+
+    forecast = forecast_inventory(db, user.id, history_days=180, today=TODAY)
+
+    item = forecast["itens"][0]
+    assert 0 < item["dias_restantes"] < MAX_PROJECTION_DAYS
+    assert item["data_prevista_fim"] == (TODAY + timedelta(days=int(item["dias_restantes"]))).isoformat()
+
+
+def test_reference_follows_today(db, user):
+    # O resultado depende só do `today` da chave do cache, não do relógio
+    _add_item(db, user, 'café', quantidade=10, consumido=10, dias_atras=9)
+
+    first = forecast_inventory(db, user.id, history_days=180, today=TODAY)
+    later = forecast_inventory(db, user.id, history_days=180, today=TODAY + timedelta(days=10))
+
+    assert first["itens"][0]["consumo_diario"] > later["itens"][0]["consumo_diario"]